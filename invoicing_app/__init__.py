@@ -1,11 +1,25 @@
 import os
+import functools
 import json
+import secrets
 import shutil
-import uuid
+import threading
 from datetime import date, datetime, timedelta
 from decimal import Decimal, InvalidOperation
-
-from flask import Flask, redirect, render_template, request, url_for, send_file, session
+from itertools import chain, zip_longest
+from operator import itemgetter
+
+from flask import (
+    Flask,
+    current_app,
+    g,
+    redirect,
+    render_template,
+    request,
+    send_file,
+    session,
+    url_for,
+)
 from flask_login import (
     LoginManager,
     UserMixin,
@@ -17,19 +31,20 @@ from flask_login import (
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from .db import (
+    SEARCH_INDEX_AVAILABLE,
     close_db,
-    ensure_customers_table,
-    ensure_expenses_table,
-    ensure_invoices_tables,
-    ensure_items_table,
-    ensure_payment_tables,
-    ensure_purchase_invoices_tables,
-    ensure_users_table,
-    ensure_vendors_table,
+    ensure_all_tables,
     get_db,
     init_app as init_db_app,
+    optimize_db,
+    rebuild_monthly_totals,
+    reset_tables_ready,
 )
 
+_lookup_cache_lock = threading.Lock()
+
+_MONTH_ABBR = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
 
 class AppUser(UserMixin):
     def __init__(self, row):
@@ -48,69 +63,50 @@ def _ensure_default_admin(db):
     if existing is not None:
         return
 
-    db.execute(
-        """
-        INSERT INTO users (username, full_name, password_hash, is_active)
-        VALUES (?, ?, ?, ?)
-        """,
-        (
-            "admin",
-            "Administrator",
-            generate_password_hash("admin123"),
-            1,
-        ),
-    )
-    db.commit()
+    with db:
+        db.execute(
+            """
+            INSERT INTO users (username, full_name, password_hash, is_active)
+            VALUES (?, ?, ?, ?)
+            """,
+            (
+                "admin",
+                "Administrator",
+                generate_password_hash("admin123"),
+                1,
+            ),
+        )
 
 
-def _generate_item_number(db):
-    for _ in range(10):
-        item_number = f"ITM-{uuid.uuid4().hex[:8].upper()}"
-        exists = db.execute(
-            "SELECT 1 FROM items WHERE item_number = ? LIMIT 1", (item_number,)
-        ).fetchone()
-        if exists is None:
-            return item_number
-    raise RuntimeError("Could not generate a unique item number")
+def _fts_phrase(search_query):
+    return '"' + search_query.replace('"', '""') + '"'
 
 
-def _generate_customer_number(db):
-    for _ in range(10):
-        customer_number = f"CUS-{uuid.uuid4().hex[:8].upper()}"
-        exists = db.execute(
-            "SELECT 1 FROM customers WHERE customer_number = ? LIMIT 1", (customer_number,)
-        ).fetchone()
-        if exists is None:
-            return customer_number
-    raise RuntimeError("Could not generate a unique customer number")
+def _like_pattern(search_query):
+    escaped = search_query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
 
 
-def _generate_vendor_number(db):
-    for _ in range(10):
-        vendor_number = f"VEN-{uuid.uuid4().hex[:8].upper()}"
-        exists = db.execute(
-            "SELECT 1 FROM vendors WHERE vendor_number = ? LIMIT 1", (vendor_number,)
-        ).fetchone()
-        if exists is None:
-            return vendor_number
-    raise RuntimeError("Could not generate a unique vendor number")
+def _round_cents(value):
+    return round(value, 2) or 0.0
 
 
-def _generate_invoice_number(db):
-    for _ in range(10):
-        invoice_number = f"INV-{uuid.uuid4().hex[:8].upper()}"
-        exists = db.execute(
-            "SELECT 1 FROM invoices WHERE invoice_number = ? LIMIT 1", (invoice_number,)
-        ).fetchone()
-        if exists is None:
-            return invoice_number
-    raise RuntimeError("Could not generate a unique invoice number")
+def _generate_number(prefix):
+    return f"{prefix}-{secrets.token_hex(8).upper()}"
+
+
+_generate_item_number = functools.partial(_generate_number, "ITM")
+_generate_customer_number = functools.partial(_generate_number, "CUS")
+_generate_vendor_number = functools.partial(_generate_number, "VEN")
+_generate_invoice_number = functools.partial(_generate_number, "INV")
+_generate_purchase_number = functools.partial(_generate_number, "PUR")
+_generate_expense_number = functools.partial(_generate_number, "EXP")
 
 
 def _ensure_unique_invoice_number(db, desired_number, exclude_invoice_id=None):
     candidate = (desired_number or "").strip()
     if not candidate:
-        return _generate_invoice_number(db)
+        return _generate_invoice_number()
 
     if exclude_invoice_id is None:
         existing = db.execute(
@@ -124,7 +120,7 @@ def _ensure_unique_invoice_number(db, desired_number, exclude_invoice_id=None):
 
     if existing is None:
         return candidate
-    return _generate_invoice_number(db)
+    return _generate_invoice_number()
 
 
 def _to_decimal_or_default(value, default="0"):
@@ -137,48 +133,180 @@ def _to_decimal_or_default(value, default="0"):
         return Decimal(default)
 
 
+_HUNDRED = Decimal("100")
+
+_PARTY_DETAIL_FIELDS = (
+    "registration_name",
+    "phone_number",
+    "address",
+    "website",
+    "country",
+    "address_2",
+)
+_CUSTOMER_FIELDS = ("customer_name", "customer_tax_number") + _PARTY_DETAIL_FIELDS
+_VENDOR_FIELDS = ("vendor_name", "vendor_tax_number") + _PARTY_DETAIL_FIELDS
+
+
+def _optional_form_values(form, fields):
+    return tuple(form.get(field, "").strip() or None for field in fields)
+
+
+def _parse_line_items(form):
+    subtotal = Decimal("0")
+    vat_total = Decimal("0")
+    item_rows = []
+
+    for raw_item_id, raw_name, raw_quantity, raw_unit, raw_price, raw_vat in zip_longest(
+        form.getlist("item_id[]"),
+        form.getlist("item_name[]"),
+        form.getlist("quantity[]"),
+        form.getlist("unit[]"),
+        form.getlist("price[]"),
+        form.getlist("vat_amount[]"),
+        fillvalue="",
+    ):
+        raw_name = raw_name.strip()
+        raw_unit = raw_unit.strip()
+        raw_item_id = raw_item_id.strip()
+
+        if not raw_name:
+            continue
+
+        quantity = _to_decimal_or_default(raw_quantity, "1")
+        price = _to_decimal_or_default(raw_price, "0")
+        if not quantity and not price:
+            continue
+
+        vat_percentage = _to_decimal_or_default(raw_vat, "0")
+        line_net = quantity * price
+        vat_value = (line_net * vat_percentage) / _HUNDRED
+        line_total = line_net + vat_value
+
+        parsed_item_id = None
+        if raw_item_id:
+            try:
+                parsed_item_id = int(raw_item_id)
+            except ValueError:
+                parsed_item_id = None
+
+        item_rows.append(
+            (
+                parsed_item_id,
+                raw_name,
+                float(quantity),
+                raw_unit or "1",
+                float(price),
+                float(vat_percentage),
+                float(line_total),
+            )
+        )
+
+        subtotal += line_net
+        vat_total += vat_value
+
+    return item_rows, subtotal, vat_total
+
+
+def _get_lookup_cache(db):
+    if "lookup_cache" not in g:
+        version = db.execute("SELECT version FROM lookup_version WHERE id = 1").fetchone()[0]
+        with _lookup_cache_lock:
+            cache = current_app.extensions.get("lookup_cache")
+            if cache is None or cache["version"] != version:
+                cache = {"version": version}
+                current_app.extensions["lookup_cache"] = cache
+        g.lookup_cache = cache
+    return g.lookup_cache
+
+
 def _get_default_currency_code(db):
-    preferred = db.execute(
+    cache = _get_lookup_cache(db)
+    code = cache.get("default_currency")
+    if code is None:
+        code = cache["default_currency"] = _query_default_currency_code(db)
+    return code
+
+
+def _get_currency_options(db):
+    cache = _get_lookup_cache(db)
+    options = cache.get("currencies")
+    if options is None:
+        options = cache["currencies"] = db.execute(
+            """
+            SELECT code, name
+            FROM payment_currencies
+            ORDER BY code ASC
+            """
+        ).fetchall()
+    return options
+
+
+def _get_payment_method_options(db):
+    cache = _get_lookup_cache(db)
+    options = cache.get("payment_methods")
+    if options is None:
+        options = cache["payment_methods"] = db.execute(
+            """
+            SELECT id, name, method_type
+            FROM payment_methods
+            ORDER BY name ASC
+            """
+        ).fetchall()
+    return options
+
+
+def _get_customer_options(db):
+    return db.execute(
         """
-        SELECT code
-        FROM payment_currencies
-        WHERE is_crypto = 0
-        ORDER BY CASE code
-            WHEN 'TRY' THEN 0
-            WHEN 'USD' THEN 1
-            WHEN 'EUR' THEN 2
-            ELSE 9
-        END, code
-        LIMIT 1
+        SELECT id, customer_name, customer_tax_number, registration_name,
+               phone_number, address, website, country, address_2
+        FROM customers
+        ORDER BY id DESC
         """
-    ).fetchone()
-    if preferred is not None and preferred["code"]:
-        return preferred["code"]
+    ).fetchall()
 
-    fallback = db.execute(
-        "SELECT code FROM payment_currencies ORDER BY code LIMIT 1"
-    ).fetchone()
-    if fallback is not None and fallback["code"]:
-        return fallback["code"]
 
-    return "USD"
+def _get_vendor_options(db):
+    return db.execute(
+        """
+        SELECT id, vendor_name, vendor_tax_number, registration_name,
+               phone_number, address, website, country, address_2
+        FROM vendors
+        ORDER BY id DESC
+        """
+    ).fetchall()
 
 
-def _generate_purchase_number(db):
-    for _ in range(10):
-        purchase_number = f"PUR-{uuid.uuid4().hex[:8].upper()}"
-        exists = db.execute(
-            "SELECT 1 FROM purchase_invoices WHERE purchase_number = ? LIMIT 1", (purchase_number,)
-        ).fetchone()
-        if exists is None:
-            return purchase_number
-    raise RuntimeError("Could not generate a unique purchase number")
+def _get_item_options(db):
+    return db.execute(
+        """
+        SELECT id, name, unit, price, vat_amount
+        FROM items
+        ORDER BY id DESC
+        """
+    ).fetchall()
+
+
+def _query_default_currency_code(db):
+    rows = db.execute(
+        "SELECT code, is_crypto FROM payment_currencies WHERE code IS NOT NULL AND code != ''"
+    ).fetchall()
+    fiat_rows = [row for row in rows if row["is_crypto"] == 0]
+    if fiat_rows:
+        priority = {"TRY": 0, "USD": 1, "EUR": 2}
+        chosen = min(fiat_rows, key=lambda row: (priority.get(row["code"], 9), row["code"]))
+        return chosen["code"]
+
+    if rows:
+        return min(row["code"] for row in rows)
+
+    return "USD"
 
 
 def _ensure_unique_purchase_number(db, desired_number, exclude_purchase_id=None):
     candidate = (desired_number or "").strip()
     if not candidate:
-        return _generate_purchase_number(db)
+        return _generate_purchase_number()
 
     if exclude_purchase_id is None:
         existing = db.execute(
@@ -192,38 +320,16 @@ def _ensure_unique_purchase_number(db, desired_number, exclude_purchase_id=None)
 
     if existing is None:
         return candidate
-    return _generate_purchase_number(db)
-
-
-def _asset_key(item_id, item_name):
-    if item_id is not None:
-        return f"id:{item_id}"
-    normalized_name = (item_name or "").strip().lower()
-    return f"name:{normalized_name}"
-
-
-def _generate_expense_number(db):
-    for _ in range(10):
-        expense_number = f"EXP-{uuid.uuid4().hex[:8].upper()}"
-        exists = db.execute(
-            "SELECT 1 FROM expenses WHERE expense_number = ? LIMIT 1", (expense_number,)
-        ).fetchone()
-        if exists is None:
-            return expense_number
-    raise RuntimeError("Could not generate a unique expense number")
+    return _generate_purchase_number()
 
 
 def create_app(test_config=None):
     app = Flask(__name__, instance_relative_config=True)
-    from datetime import timedelta
     app.config.from_mapping(
         SECRET_KEY="dev",
         DATABASE=os.path.join(app.instance_path, "invoicing.sqlite"),
         PERMANENT_SESSION_LIFETIME=timedelta(minutes=30),
     )
-    @app.before_request
-    def make_session_permanent():
-        session.permanent = True
 
     if test_config is None:
         app.config.from_pyfile("config.py", silent=True)
@@ -239,15 +345,10 @@ def create_app(test_config=None):
     app.teardown_appcontext(close_db)
 
     with app.app_context():
-        ensure_items_table()
-        ensure_customers_table()
-        ensure_vendors_table()
-        ensure_invoices_tables()
-        ensure_purchase_invoices_tables()
-        ensure_expenses_table()
-        ensure_payment_tables()
-        ensure_users_table()
+        ensure_all_tables()
         _ensure_default_admin(get_db())
+        _get_default_currency_code(get_db())
+        optimize_db()
 
     login_manager = LoginManager()
     login_manager.login_view = "login"
@@ -256,7 +357,6 @@ def create_app(test_config=None):
     @login_manager.user_loader
     def load_user(user_id):
         db = get_db()
-        ensure_users_table()
         row = db.execute(
             """
             SELECT id, username, full_name, is_active
@@ -290,7 +390,6 @@ def create_app(test_config=None):
 
         if request.method == "POST":
             db = get_db()
-            ensure_users_table()
 
             username = request.form.get("username", "").strip()
             password = request.form.get("password", "")
@@ -310,6 +409,7 @@ def create_app(test_config=None):
                 and check_password_hash(user_row["password_hash"], password)
             ):
                 login_user(AppUser(user_row), remember=True)
+                session.permanent = True
                 return redirect(url_for("dashboard"))
 
             return render_template(
@@ -336,28 +436,42 @@ def create_app(test_config=None):
     @login_required
     def users_page():
         db = get_db()
-        ensure_users_table()
 
+        try:
+            before_id = int(request.args.get("before_id", "").strip())
+        except ValueError:
+            before_id = None
+
+        page_size = 50
         users = db.execute(
             """
             SELECT id, username, full_name, is_active, created_at
             FROM users
+            WHERE (? IS NULL OR id < ?)
             ORDER BY id DESC
-            """
+            LIMIT ?
+            """,
+            (before_id, before_id, page_size + 1),
         ).fetchall()
 
+        next_before_id = None
+        if len(users) > page_size:
+            users = users[:page_size]
+            next_before_id = users[-1]["id"]
+
         return render_template(
             "users.html",
             page_title="Users",
             active_menu="Users",
             users=users,
+            before_id=before_id,
+            next_before_id=next_before_id,
         )
 
     @app.post("/users/add")
     @login_required
     def add_user():
         db = get_db()
-        ensure_users_table()
 
         username = request.form.get("username", "").strip()
         full_name = request.form.get("full_name", "").strip() or None
@@ -374,21 +488,20 @@ def create_app(test_config=None):
         if existing is not None:
             return redirect(url_for("users_page"))
 
-        db.execute(
-            """
-            INSERT INTO users (username, full_name, password_hash, is_active)
-            VALUES (?, ?, ?, ?)
-            """,
-            (username, full_name, generate_password_hash(password), is_active),
-        )
-        db.commit()
+        with db:
+            db.execute(
+                """
+                INSERT INTO users (username, full_name, password_hash, is_active)
+                VALUES (?, ?, ?, ?)
+                """,
+                (username, full_name, generate_password_hash(password), is_active),
+            )
         return redirect(url_for("users_page"))
 
     @app.post("/users/edit")
     @login_required
     def edit_user():
         db = get_db()
-        ensure_users_table()
 
         user_id = request.form.get("user_id", "").strip()
         username = request.form.get("username", "").strip()
@@ -410,22 +523,21 @@ def create_app(test_config=None):
         if existing is not None:
             return redirect(url_for("users_page"))
 
-        db.execute(
-            """
-            UPDATE users
-            SET username = ?, full_name = ?, is_active = ?
-            WHERE id = ?
-            """,
-            (username, full_name, is_active, parsed_user_id),
-        )
-        db.commit()
+        with db:
+            db.execute(
+                """
+                UPDATE users
+                SET username = ?, full_name = ?, is_active = ?
+                WHERE id = ?
+                """,
+                (username, full_name, is_active, parsed_user_id),
+            )
         return redirect(url_for("users_page"))
 
     @app.post("/users/delete")
     @login_required
     def delete_user():
         db = get_db()
-        ensure_users_table()
 
         user_id = request.form.get("user_id", "").strip()
         try:
@@ -436,15 +548,14 @@ def create_app(test_config=None):
         if str(parsed_user_id) == current_user.get_id():
             return redirect(url_for("users_page"))
 
-        db.execute("DELETE FROM users WHERE id = ?", (parsed_user_id,))
-        db.commit()
+        with db:
+            db.execute("DELETE FROM users WHERE id = ?", (parsed_user_id,))
         return redirect(url_for("users_page"))
 
     @app.post("/users/reset-password")
     @login_required
     def reset_user_password():
         db = get_db()
-        ensure_users_table()
 
         user_id = request.form.get("user_id", "").strip()
         new_password = request.form.get("new_password", "")
@@ -456,11 +567,11 @@ def create_app(test_config=None):
         except ValueError:
             return redirect(url_for("users_page"))
 
-        db.execute(
-            "UPDATE users SET password_hash = ? WHERE id = ?",
-            (generate_password_hash(new_password), parsed_user_id),
-        )
-        db.commit()
+        with db:
+            db.execute(
+                "UPDATE users SET password_hash = ? WHERE id = ?",
+                (generate_password_hash(new_password), parsed_user_id),
+            )
         return redirect(url_for("users_page"))
 
     @app.route("/settings")
@@ -481,6 +592,7 @@ def create_app(test_config=None):
         if not os.path.exists(database_path):
             return redirect(url_for("settings_page", status="backup-missing"))
 
+        get_db().execute("PRAGMA wal_checkpoint(TRUNCATE)")
         filename = f"invoicing-backup-{date.today().isoformat()}.sqlite"
         return send_file(database_path, as_attachment=True, download_name=filename)
 
@@ -495,6 +607,7 @@ def create_app(test_config=None):
         os.makedirs(os.path.dirname(database_path), exist_ok=True)
 
         if os.path.exists(database_path):
+            get_db().execute("PRAGMA wal_checkpoint(TRUNCATE)")
             backups_dir = os.path.join(app.instance_path, "backups")
             os.makedirs(backups_dir, exist_ok=True)
             timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
@@ -503,17 +616,30 @@ def create_app(test_config=None):
 
         temp_path = database_path + ".restore"
         with open(temp_path, "wb") as handle:
-            shutil.copyfileobj(uploaded_file.stream, handle)
+            shutil.copyfileobj(uploaded_file.stream, handle, length=1024 * 1024)
+            handle.flush()
+            os.fsync(handle.fileno())
 
         close_db()
         os.replace(temp_path, database_path)
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(database_path + suffix):
+                os.remove(database_path + suffix)
 
         db = get_db()
-        ensure_users_table()
+        reset_tables_ready()
+        ensure_all_tables()
         _ensure_default_admin(db)
+        optimize_db()
 
         return redirect(url_for("settings_page", status="restore-ok"))
 
+    @app.post("/settings/refresh-summary")
+    @login_required
+    def refresh_summary():
+        rebuild_monthly_totals()
+        return redirect(url_for("settings_page", status="refresh-ok"))
+
     @app.route("/")
     def index():
         if not current_user.is_authenticated:
@@ -524,70 +650,42 @@ def create_app(test_config=None):
     @login_required
     def dashboard():
         db = get_db()
-        ensure_invoices_tables()
-        ensure_purchase_invoices_tables()
-        ensure_expenses_table()
-        ensure_payment_tables()
 
         def _previous_period_bounds(selected_period, current_start):
-            if selected_period == "year":
-                prev_start = date(current_start.year - 1, 1, 1)
-                prev_end = date(current_start.year - 1, 12, 31)
-                return prev_start, prev_end
-
-            if selected_period == "quarter":
-                current_quarter = ((current_start.month - 1) // 3) + 1
-                if current_quarter == 1:
-                    prev_year = current_start.year - 1
-                    prev_quarter = 4
-                else:
-                    prev_year = current_start.year
-                    prev_quarter = current_quarter - 1
-                prev_start_month = (prev_quarter - 1) * 3 + 1
-                prev_start = date(prev_year, prev_start_month, 1)
-                prev_end = date(prev_year, prev_start_month + 2, 1)
-                if prev_start_month + 2 == 12:
-                    prev_end = date(prev_year, 12, 31)
-                else:
-                    prev_end = date(prev_year, prev_start_month + 3, 1) - timedelta(days=1)
-                return prev_start, prev_end
-
-            if current_start.month == 1:
-                prev_start = date(current_start.year - 1, 12, 1)
-                prev_end = date(current_start.year, 1, 1) - timedelta(days=1)
-            else:
-                prev_start = date(current_start.year, current_start.month - 1, 1)
-                prev_end = date(current_start.year, current_start.month, 1) - timedelta(days=1)
+            span_months = {"month": 1, "quarter": 3, "year": 12}[selected_period]
+            month_index = current_start.year * 12 + current_start.month - 1 - span_months
+            prev_start = date(month_index // 12, month_index % 12 + 1, 1)
+            prev_end = current_start - timedelta(days=1)
             return prev_start, prev_end
 
         def _trend(current_value, previous_value, positive_is_good=True):
-            current_decimal = Decimal(str(current_value))
-            previous_decimal = Decimal(str(previous_value))
-            diff = current_decimal - previous_decimal
+            current_f = float(current_value or 0)
+            previous_f = float(previous_value or 0)
+            diff = current_f - previous_f
 
-            if diff == 0:
+            if abs(diff) < 1e-9:
                 return {
                     "label": "No change",
                     "icon": "→",
                     "css": "text-muted",
                 }
 
-            if previous_decimal == 0:
+            if abs(previous_f) < 1e-9:
                 sign = "+" if diff > 0 else "-"
                 direction_icon = "↑" if diff > 0 else "↓"
                 is_good = (diff > 0 and positive_is_good) or (diff < 0 and not positive_is_good)
                 return {
-                    "label": f"{sign}{abs(float(diff)):.2f} vs prev",
+                    "label": f"{sign}{abs(diff):.2f} vs prev",
                     "icon": direction_icon,
                     "css": "text-success" if is_good else "text-danger",
                 }
 
-            percentage = (diff / previous_decimal) * Decimal("100")
+            percentage = (diff / previous_f) * 100
             direction_icon = "↑" if diff > 0 else "↓"
             is_good = (diff > 0 and positive_is_good) or (diff < 0 and not positive_is_good)
             sign = "+" if percentage > 0 else ""
             return {
-                "label": f"{sign}{float(percentage):.1f}% vs prev",
+                "label": f"{sign}{percentage:.1f}% vs prev",
                 "icon": direction_icon,
                 "css": "text-success" if is_good else "text-danger",
             }
@@ -615,229 +713,179 @@ def create_app(test_config=None):
         previous_start_iso = previous_start.isoformat()
         previous_end_iso = previous_end.isoformat()
 
-        sales_total_raw = db.execute(
-            """
-            SELECT COALESCE(SUM(total), 0) AS total
-            FROM invoices
-            WHERE invoice_date >= ? AND invoice_date <= ?
-            """,
-            (start_iso, end_iso),
-        ).fetchone()
-        purchase_total_raw = db.execute(
-            """
-            SELECT COALESCE(SUM(total), 0) AS total
-            FROM purchase_invoices
-            WHERE purchase_date >= ? AND purchase_date <= ?
-            """,
-            (start_iso, end_iso),
-        ).fetchone()
-        expense_total_raw = db.execute(
-            """
-            SELECT COALESCE(SUM(amount), 0) AS total
-            FROM expenses
-            WHERE expense_date >= ? AND expense_date <= ?
-            """,
-            (start_iso, end_iso),
-        ).fetchone()
-
-        sales_total = Decimal(str(sales_total_raw["total"] or 0))
-        purchase_total = Decimal(str(purchase_total_raw["total"] or 0))
-        expense_total = Decimal(str(expense_total_raw["total"] or 0))
-        net_profit = sales_total - purchase_total - expense_total
-
-        prev_sales_raw = db.execute(
-            """
-            SELECT COALESCE(SUM(total), 0) AS total
-            FROM invoices
-            WHERE invoice_date >= ? AND invoice_date <= ?
-            """,
-            (previous_start_iso, previous_end_iso),
-        ).fetchone()
-        prev_purchases_raw = db.execute(
-            """
-            SELECT COALESCE(SUM(total), 0) AS total
-            FROM purchase_invoices
-            WHERE purchase_date >= ? AND purchase_date <= ?
-            """,
-            (previous_start_iso, previous_end_iso),
-        ).fetchone()
-        prev_expenses_raw = db.execute(
-            """
-            SELECT COALESCE(SUM(amount), 0) AS total
-            FROM expenses
-            WHERE expense_date >= ? AND expense_date <= ?
-            """,
-            (previous_start_iso, previous_end_iso),
-        ).fetchone()
-
-        prev_sales_total = Decimal(str(prev_sales_raw["total"] or 0))
-        prev_purchase_total = Decimal(str(prev_purchases_raw["total"] or 0))
-        prev_expense_total = Decimal(str(prev_expenses_raw["total"] or 0))
-        prev_net_profit = prev_sales_total - prev_purchase_total - prev_expense_total
-
-        receivables_raw = db.execute(
-            """
-            SELECT COALESCE(SUM(i.total), 0) - COALESCE(SUM(r.received_amount), 0) AS outstanding
-            FROM invoices i
-            LEFT JOIN (
-                SELECT reference_id, SUM(amount) AS received_amount
-                FROM payment_transactions
-                WHERE reference_type = 'invoice'
-                  AND transaction_type = 'invoice_receipt'
-                GROUP BY reference_id
-            ) r ON r.reference_id = i.id
-            """
-        ).fetchone()
-        payables_raw = db.execute(
-            """
-            SELECT COALESCE(SUM(p.total), 0) - COALESCE(SUM(pay.paid_amount), 0) AS outstanding
-            FROM purchase_invoices p
-            LEFT JOIN (
-                SELECT reference_id, SUM(amount) AS paid_amount
-                FROM payment_transactions
-                WHERE reference_type = 'purchase'
-                  AND transaction_type = 'purchase_payment'
-                GROUP BY reference_id
-            ) pay ON pay.reference_id = p.id
-            """
-        ).fetchone()
-
-        receivables = Decimal(str(receivables_raw["outstanding"] or 0))
-        payables = Decimal(str(payables_raw["outstanding"] or 0))
-
-        prev_receivables_raw = db.execute(
-            """
-            SELECT COALESCE(SUM(i.total), 0) - COALESCE(SUM(r.received_amount), 0) AS outstanding
-            FROM invoices i
-            LEFT JOIN (
-                SELECT reference_id, SUM(amount) AS received_amount
-                FROM payment_transactions
-                WHERE reference_type = 'invoice'
-                  AND transaction_type = 'invoice_receipt'
-                  AND transaction_date <= ?
-                GROUP BY reference_id
-            ) r ON r.reference_id = i.id
-            WHERE i.invoice_date <= ?
-            """,
-            (previous_end_iso, previous_end_iso),
-        ).fetchone()
-        prev_payables_raw = db.execute(
-            """
-            SELECT COALESCE(SUM(p.total), 0) - COALESCE(SUM(pay.paid_amount), 0) AS outstanding
-            FROM purchase_invoices p
-            LEFT JOIN (
-                SELECT reference_id, SUM(amount) AS paid_amount
-                FROM payment_transactions
-                WHERE reference_type = 'purchase'
-                  AND transaction_type = 'purchase_payment'
-                  AND transaction_date <= ?
-                GROUP BY reference_id
-            ) pay ON pay.reference_id = p.id
-            WHERE p.purchase_date <= ?
-            """,
-            (previous_end_iso, previous_end_iso),
-        ).fetchone()
-
-        prev_receivables = Decimal(str(prev_receivables_raw["outstanding"] or 0))
-        prev_payables = Decimal(str(prev_payables_raw["outstanding"] or 0))
-
-        payments_in_raw = db.execute(
-            """
-            SELECT COALESCE(SUM(amount), 0) AS total
-            FROM payment_transactions
-            WHERE transaction_type = 'invoice_receipt'
-              AND transaction_date >= ? AND transaction_date <= ?
-            """,
-            (start_iso, end_iso),
-        ).fetchone()
-        payments_out_raw = db.execute(
-            """
-            SELECT COALESCE(SUM(amount), 0) AS total
-            FROM payment_transactions
-            WHERE transaction_type IN ('purchase_payment', 'expense_payment')
-              AND transaction_date >= ? AND transaction_date <= ?
-            """,
-            (start_iso, end_iso),
-        ).fetchone()
-
-        payments_in = Decimal(str(payments_in_raw["total"] or 0))
-        payments_out = Decimal(str(payments_out_raw["total"] or 0))
-
-        received_vat_raw = db.execute(
-            """
-            SELECT COALESCE(SUM(
-                CASE WHEN i.total > 0 THEN (i.vat_total / i.total) * t.amount ELSE 0 END
-            ), 0) AS total
-            FROM payment_transactions t
-            JOIN invoices i ON i.id = t.reference_id
-            WHERE t.reference_type = 'invoice'
-              AND t.transaction_type = 'invoice_receipt'
-              AND t.transaction_date >= ? AND t.transaction_date <= ?
-            """,
-            (start_iso, end_iso),
-        ).fetchone()
-        paid_vat_raw = db.execute(
-            """
-            SELECT COALESCE(SUM(
-                CASE WHEN p.total > 0 THEN (p.vat_total / p.total) * t.amount ELSE 0 END
-            ), 0) AS total
-            FROM payment_transactions t
-            JOIN purchase_invoices p ON p.id = t.reference_id
-            WHERE t.reference_type = 'purchase'
-              AND t.transaction_type = 'purchase_payment'
-              AND t.transaction_date >= ? AND t.transaction_date <= ?
-            """,
-            (start_iso, end_iso),
-        ).fetchone()
-
-        received_vat = Decimal(str(received_vat_raw["total"] or 0))
-        paid_vat = Decimal(str(paid_vat_raw["total"] or 0))
-        vat_balance = received_vat - paid_vat
-
         month_cursor = date(today.year, today.month, 1)
-        month_keys = []
+        months = []
         for _ in range(12):
-            month_keys.append(month_cursor.strftime("%Y-%m"))
+            months.append((month_cursor.year, month_cursor.month))
             if month_cursor.month == 1:
                 month_cursor = date(month_cursor.year - 1, 12, 1)
             else:
                 month_cursor = date(month_cursor.year, month_cursor.month - 1, 1)
-        month_keys.reverse()
+        months.reverse()
+        month_keys = [f"{year:04d}-{month:02d}" for year, month in months]
 
-        trend_start = f"{month_keys[0]}-01"
-        invoices_trend_rows = db.execute(
-            """
-            SELECT strftime('%Y-%m', invoice_date) AS period, COALESCE(SUM(total), 0) AS total
-            FROM invoices
-            WHERE invoice_date >= ?
-            GROUP BY strftime('%Y-%m', invoice_date)
-            """,
-            (trend_start,),
-        ).fetchall()
-        purchases_trend_rows = db.execute(
+        current_month = month_keys[-1]
+        start_month = start_iso[:7]
+        previous_start_month = previous_start_iso[:7]
+        previous_end_month = previous_end_iso[:7]
+        month_start_iso = f"{current_month}-01"
+
+        monthly_rows = db.execute(
             """
-            SELECT strftime('%Y-%m', purchase_date) AS period, COALESCE(SUM(total), 0) AS total
-            FROM purchase_invoices
-            WHERE purchase_date >= ?
-            GROUP BY strftime('%Y-%m', purchase_date)
+            SELECT 'month' AS kind, period, sales, purchases, expenses
+            FROM monthly_totals
+            WHERE period >= ?
+            UNION ALL
+            SELECT
+                'to_date' AS kind,
+                NULL AS period,
+                (
+                    SELECT TOTAL(total)
+                    FROM invoices
+                    WHERE invoice_date >= ? AND invoice_date <= ?
+                ) AS sales,
+                (
+                    SELECT TOTAL(total)
+                    FROM purchase_invoices
+                    WHERE purchase_date >= ? AND purchase_date <= ?
+                ) AS purchases,
+                (
+                    SELECT TOTAL(amount)
+                    FROM expenses
+                    WHERE expense_date >= ? AND expense_date <= ?
+                ) AS expenses
             """,
-            (trend_start,),
+            (min(previous_start_month, month_keys[0]),) + (month_start_iso, end_iso) * 3,
         ).fetchall()
-        expenses_trend_rows = db.execute(
+
+        current_sums = [0.0, 0.0, 0.0]
+        previous_sums = [0.0, 0.0, 0.0]
+        invoices_map = {}
+        purchases_map = {}
+        expenses_map = {}
+        for row in monthly_rows:
+            values = (row["sales"], row["purchases"], row["expenses"])
+            month = row["period"]
+            if row["kind"] == "to_date":
+                in_current = True
+                in_previous = False
+            else:
+                in_current = start_month <= month < current_month
+                in_previous = previous_start_month <= month <= previous_end_month
+                if month in month_keys:
+                    invoices_map[month] = values[0]
+                    purchases_map[month] = values[1]
+                    expenses_map[month] = values[2]
+            for index, value in enumerate(values):
+                if in_current:
+                    current_sums[index] += value
+                if in_previous:
+                    previous_sums[index] += value
+
+        sales_total, purchase_total, expense_total = current_sums
+        prev_sales_total, prev_purchase_total, prev_expense_total = previous_sums
+        net_profit = _round_cents(sales_total - purchase_total - expense_total)
+        prev_net_profit = _round_cents(prev_sales_total - prev_purchase_total - prev_expense_total)
+
+        summary_raw = db.execute(
             """
-            SELECT strftime('%Y-%m', expense_date) AS period, COALESCE(SUM(amount), 0) AS total
-            FROM expenses
-            WHERE expense_date >= ?
-            GROUP BY strftime('%Y-%m', expense_date)
+            SELECT
+                (
+                    SELECT TOTAL(i.total) - TOTAL(r.received_amount)
+                    FROM invoices i
+                    LEFT JOIN (
+                        SELECT reference_id, SUM(amount) AS received_amount
+                        FROM payment_transactions
+                        WHERE reference_type = 'invoice'
+                          AND transaction_type = 'invoice_receipt'
+                        GROUP BY reference_id
+                    ) r ON r.reference_id = i.id
+                ) AS receivables,
+                (
+                    SELECT TOTAL(p.total) - TOTAL(pay.paid_amount)
+                    FROM purchase_invoices p
+                    LEFT JOIN (
+                        SELECT reference_id, SUM(amount) AS paid_amount
+                        FROM payment_transactions
+                        WHERE reference_type = 'purchase'
+                          AND transaction_type = 'purchase_payment'
+                        GROUP BY reference_id
+                    ) pay ON pay.reference_id = p.id
+                ) AS payables,
+                (
+                    SELECT TOTAL(i.total) - TOTAL(r.received_amount)
+                    FROM invoices i
+                    LEFT JOIN (
+                        SELECT reference_id, SUM(amount) AS received_amount
+                        FROM payment_transactions
+                        WHERE reference_type = 'invoice'
+                          AND transaction_type = 'invoice_receipt'
+                          AND transaction_date <= ?
+                        GROUP BY reference_id
+                    ) r ON r.reference_id = i.id
+                    WHERE i.invoice_date <= ?
+                ) AS prev_receivables,
+                (
+                    SELECT TOTAL(p.total) - TOTAL(pay.paid_amount)
+                    FROM purchase_invoices p
+                    LEFT JOIN (
+                        SELECT reference_id, SUM(amount) AS paid_amount
+                        FROM payment_transactions
+                        WHERE reference_type = 'purchase'
+                          AND transaction_type = 'purchase_payment'
+                          AND transaction_date <= ?
+                        GROUP BY reference_id
+                    ) pay ON pay.reference_id = p.id
+                    WHERE p.purchase_date <= ?
+                ) AS prev_payables,
+                (
+                    SELECT TOTAL(amount)
+                    FROM payment_transactions
+                    WHERE transaction_type = 'invoice_receipt'
+                      AND transaction_date >= ? AND transaction_date <= ?
+                ) AS payments_in,
+                (
+                    SELECT TOTAL(amount)
+                    FROM payment_transactions
+                    WHERE transaction_type IN ('purchase_payment', 'expense_payment')
+                      AND transaction_date >= ? AND transaction_date <= ?
+                ) AS payments_out,
+                (
+                    SELECT TOTAL(
+                        CASE WHEN i.total > 0 THEN (i.vat_total / i.total) * t.amount ELSE 0 END
+                    )
+                    FROM payment_transactions t
+                    JOIN invoices i ON i.id = t.reference_id
+                    WHERE t.reference_type = 'invoice'
+                      AND t.transaction_type = 'invoice_receipt'
+                      AND t.transaction_date >= ? AND t.transaction_date <= ?
+                ) AS received_vat,
+                (
+                    SELECT TOTAL(
+                        CASE WHEN p.total > 0 THEN (p.vat_total / p.total) * t.amount ELSE 0 END
+                    )
+                    FROM payment_transactions t
+                    JOIN purchase_invoices p ON p.id = t.reference_id
+                    WHERE t.reference_type = 'purchase'
+                      AND t.transaction_type = 'purchase_payment'
+                      AND t.transaction_date >= ? AND t.transaction_date <= ?
+                ) AS paid_vat
             """,
-            (trend_start,),
-        ).fetchall()
-
-        invoices_map = {row["period"]: float(row["total"] or 0) for row in invoices_trend_rows if row["period"]}
-        purchases_map = {row["period"]: float(row["total"] or 0) for row in purchases_trend_rows if row["period"]}
-        expenses_map = {row["period"]: float(row["total"] or 0) for row in expenses_trend_rows if row["period"]}
+            (previous_end_iso, previous_end_iso, previous_end_iso, previous_end_iso)
+            + (start_iso, end_iso) * 4,
+        ).fetchone()
 
-        chart_labels = [datetime.strptime(key, "%Y-%m").strftime("%b %Y") for key in month_keys]
+        receivables = summary_raw["receivables"]
+        payables = summary_raw["payables"]
+        prev_receivables = summary_raw["prev_receivables"]
+        prev_payables = summary_raw["prev_payables"]
+        payments_in = summary_raw["payments_in"]
+        payments_out = summary_raw["payments_out"]
+        received_vat = summary_raw["received_vat"]
+        paid_vat = summary_raw["paid_vat"]
+        vat_balance = _round_cents(received_vat - paid_vat)
+
+        chart_labels = [f"{_MONTH_ABBR[month - 1]} {year}" for year, month in months]
         chart_sales = [invoices_map.get(key, 0.0) for key in month_keys]
         chart_purchases = [purchases_map.get(key, 0.0) for key in month_keys]
         chart_expenses = [expenses_map.get(key, 0.0) for key in month_keys]
@@ -849,122 +897,152 @@ def create_app(test_config=None):
         recent_invoices = db.execute(
             """
             SELECT
-                i.id,
-                i.invoice_number,
-                i.invoice_date,
-                i.customer_name,
-                i.total,
-                COALESCE(r.received_amount, 0) AS paid_amount,
-                MAX(i.total - COALESCE(r.received_amount, 0), 0) AS outstanding_amount
-            FROM invoices i
-            LEFT JOIN (
-                SELECT reference_id, SUM(amount) AS received_amount
-                FROM payment_transactions
-                WHERE reference_type = 'invoice'
-                  AND transaction_type = 'invoice_receipt'
-                GROUP BY reference_id
-            ) r ON r.reference_id = i.id
-            ORDER BY i.id DESC
-            LIMIT 5
+                id,
+                invoice_number,
+                invoice_date,
+                customer_name,
+                total,
+                paid_amount,
+                CASE
+                    WHEN total - paid_amount > 0 THEN total - paid_amount
+                    ELSE 0
+                END AS outstanding_amount
+            FROM (
+                SELECT
+                    i.id,
+                    i.invoice_number,
+                    i.invoice_date,
+                    i.customer_name,
+                    i.total,
+                    COALESCE((
+                        SELECT SUM(pt.amount)
+                        FROM payment_transactions pt
+                        WHERE pt.reference_type = 'invoice'
+                          AND pt.transaction_type = 'invoice_receipt'
+                          AND pt.reference_id = i.id
+                    ), 0) AS paid_amount
+                FROM invoices i
+                ORDER BY i.id DESC
+                LIMIT 5
+            )
+            ORDER BY id DESC
             """
         ).fetchall()
 
         recent_purchases = db.execute(
             """
             SELECT
-                p.id,
-                p.purchase_number,
-                p.purchase_date,
-                p.vendor_name,
-                p.total,
-                COALESCE(pay.paid_amount, 0) AS paid_amount,
-                MAX(p.total - COALESCE(pay.paid_amount, 0), 0) AS outstanding_amount
-            FROM purchase_invoices p
-            LEFT JOIN (
-                SELECT reference_id, SUM(amount) AS paid_amount
-                FROM payment_transactions
-                WHERE reference_type = 'purchase'
-                  AND transaction_type = 'purchase_payment'
-                GROUP BY reference_id
-            ) pay ON pay.reference_id = p.id
-            ORDER BY p.id DESC
-            LIMIT 5
+                id,
+                purchase_number,
+                purchase_date,
+                vendor_name,
+                total,
+                paid_amount,
+                CASE
+                    WHEN total - paid_amount > 0 THEN total - paid_amount
+                    ELSE 0
+                END AS outstanding_amount
+            FROM (
+                SELECT
+                    p.id,
+                    p.purchase_number,
+                    p.purchase_date,
+                    p.vendor_name,
+                    p.total,
+                    COALESCE((
+                        SELECT SUM(pt.amount)
+                        FROM payment_transactions pt
+                        WHERE pt.reference_type = 'purchase'
+                          AND pt.transaction_type = 'purchase_payment'
+                          AND pt.reference_id = p.id
+                    ), 0) AS paid_amount
+                FROM purchase_invoices p
+                ORDER BY p.id DESC
+                LIMIT 5
+            )
+            ORDER BY id DESC
             """
         ).fetchall()
 
-        purchased_rows = db.execute(
-            """
-            SELECT item_id, item_name, unit, COALESCE(SUM(quantity), 0) AS purchased_qty
-            FROM purchase_invoice_items
-            GROUP BY item_id, item_name, unit
-            """
-        ).fetchall()
-        sold_rows = db.execute(
+        stock_alerts = db.execute(
             """
-            SELECT item_id, item_name, unit, COALESCE(SUM(quantity), 0) AS sold_qty
-            FROM invoice_items
-            GROUP BY item_id, item_name, unit
+            SELECT
+                COALESCE(NULLIF(MAX(display_name), ''), '-') AS item_name,
+                COALESCE(NULLIF(MAX(display_unit), ''), 'pcs') AS unit,
+                SUM(CASE WHEN src = 'p' THEN quantity ELSE -quantity END) AS available
+            FROM (
+                SELECT
+                    group_key,
+                    src,
+                    quantity,
+                    FIRST_VALUE(item_name) OVER (
+                        PARTITION BY group_key
+                        ORDER BY COALESCE(item_name, '') = '', src DESC, document_date DESC, line_id DESC
+                    ) AS display_name,
+                    FIRST_VALUE(unit) OVER (
+                        PARTITION BY group_key
+                        ORDER BY COALESCE(unit, '') = '', src DESC, document_date DESC, line_id DESC
+                    ) AS display_unit
+                FROM (
+                    SELECT
+                        CASE
+                            WHEN pii.item_id IS NOT NULL THEN 'id:' || pii.item_id
+                            ELSE 'name:' || normalized_name(pii.item_name)
+                        END AS group_key,
+                        'p' AS src,
+                        pii.id AS line_id,
+                        pii.item_name,
+                        pii.unit,
+                        pii.quantity,
+                        pi.purchase_date AS document_date
+                    FROM purchase_invoice_items pii
+                    JOIN purchase_invoices pi ON pi.id = pii.purchase_invoice_id
+                    UNION ALL
+                    SELECT
+                        CASE
+                            WHEN ii.item_id IS NOT NULL THEN 'id:' || ii.item_id
+                            ELSE 'name:' || normalized_name(ii.item_name)
+                        END AS group_key,
+                        's' AS src,
+                        ii.id AS line_id,
+                        ii.item_name,
+                        ii.unit,
+                        ii.quantity,
+                        i.invoice_date AS document_date
+                    FROM invoice_items ii
+                    JOIN invoices i ON i.id = ii.invoice_id
+                )
+            )
+            GROUP BY group_key
+            HAVING available <= 5
+            ORDER BY available, item_name
+            LIMIT 5
             """
         ).fetchall()
 
-        stock_map = {}
-        for row in purchased_rows:
-            key = _asset_key(row["item_id"], row["item_name"])
-            stock_map[key] = {
-                "item_name": row["item_name"] or "-",
-                "unit": row["unit"] or "pcs",
-                "purchased": Decimal(str(row["purchased_qty"] or 0)),
-                "sold": Decimal("0"),
-            }
-
-        for row in sold_rows:
-            key = _asset_key(row["item_id"], row["item_name"])
-            if key not in stock_map:
-                stock_map[key] = {
-                    "item_name": row["item_name"] or "-",
-                    "unit": row["unit"] or "pcs",
-                    "purchased": Decimal("0"),
-                    "sold": Decimal("0"),
-                }
-            stock_map[key]["sold"] = Decimal(str(row["sold_qty"] or 0))
-
-        stock_alerts = []
-        for entry in stock_map.values():
-            available = entry["purchased"] - entry["sold"]
-            if available <= Decimal("5"):
-                stock_alerts.append(
-                    {
-                        "item_name": entry["item_name"],
-                        "unit": entry["unit"],
-                        "available": float(available),
-                    }
-                )
-        stock_alerts.sort(key=lambda value: value["available"])
-        stock_alerts = stock_alerts[:5]
-
         return render_template(
             "index.html",
             page_title="Dashboard",
             active_menu="Dashboard",
             period=period,
             period_label=period_label,
-            sales_total=float(sales_total),
-            purchase_total=float(purchase_total),
-            expense_total=float(expense_total),
-            net_profit=float(net_profit),
-            receivables=float(receivables),
-            payables=float(payables),
+            sales_total=sales_total,
+            purchase_total=purchase_total,
+            expense_total=expense_total,
+            net_profit=net_profit,
+            receivables=receivables,
+            payables=payables,
             sales_trend=_trend(sales_total, prev_sales_total, positive_is_good=True),
             purchases_trend=_trend(purchase_total, prev_purchase_total, positive_is_good=False),
             expenses_trend=_trend(expense_total, prev_expense_total, positive_is_good=False),
             net_profit_trend=_trend(net_profit, prev_net_profit, positive_is_good=True),
             receivables_trend=_trend(receivables, prev_receivables, positive_is_good=False),
             payables_trend=_trend(payables, prev_payables, positive_is_good=False),
-            received_vat=float(received_vat),
-            paid_vat=float(paid_vat),
-            vat_balance=float(vat_balance),
-            payments_in=float(payments_in),
-            payments_out=float(payments_out),
+            received_vat=received_vat,
+            paid_vat=paid_vat,
+            vat_balance=vat_balance,
+            payments_in=payments_in,
+            payments_out=payments_out,
             chart_labels=json.dumps(chart_labels),
             chart_sales=json.dumps(chart_sales),
             chart_purchases=json.dumps(chart_purchases),
@@ -978,44 +1056,73 @@ def create_app(test_config=None):
     @app.route("/items")
     def items_page():
         db = get_db()
-        ensure_items_table()
         search_query = request.args.get("q", "").strip()
 
-        if search_query:
-            like_query = f"%{search_query}%"
+        try:
+            before_id = int(request.args.get("before_id", "").strip())
+        except ValueError:
+            before_id = None
+
+        page_size = 50
+
+        if SEARCH_INDEX_AVAILABLE and len(search_query) >= 3:
             items = db.execute(
                 """
                 SELECT id, item_number, name, price, vat_amount, unit, description
                 FROM items
-                WHERE item_number LIKE ?
-                   OR name LIKE ?
-                   OR unit LIKE ?
-                   OR description LIKE ?
+                WHERE id IN (SELECT rowid FROM items_fts WHERE items_fts MATCH ?)
+                  AND (? IS NULL OR id < ?)
                 ORDER BY id DESC
+                LIMIT ?
                 """,
-                (like_query, like_query, like_query, like_query),
+                (_fts_phrase(search_query), before_id, before_id, page_size + 1),
             ).fetchall()
-        else:
+        elif search_query:
+            like_query = f"%{search_query}%"
             items = db.execute(
                 """
                 SELECT id, item_number, name, price, vat_amount, unit, description
                 FROM items
+                WHERE (item_number LIKE ?
+                   OR name LIKE ?
+                   OR unit LIKE ?
+                   OR description LIKE ?)
+                  AND (? IS NULL OR id < ?)
                 ORDER BY id DESC
+                LIMIT ?
+                """,
+                (like_query, like_query, like_query, like_query, before_id, before_id, page_size + 1),
+            ).fetchall()
+        else:
+            items = db.execute(
                 """
+                SELECT id, item_number, name, price, vat_amount, unit, description
+                FROM items
+                WHERE (? IS NULL OR id < ?)
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (before_id, before_id, page_size + 1),
             ).fetchall()
 
+        next_before_id = None
+        if len(items) > page_size:
+            items = items[:page_size]
+            next_before_id = items[-1]["id"]
+
         return render_template(
             "items.html",
             page_title="Items",
             active_menu="Items",
             items=items,
             search_query=search_query,
+            before_id=before_id,
+            next_before_id=next_before_id,
         )
 
     @app.post("/items/add")
     def add_item():
         db = get_db()
-        ensure_items_table()
 
         name = request.form.get("name", "").strip()
         unit = request.form.get("unit", "").strip()
@@ -1031,41 +1138,40 @@ def create_app(test_config=None):
 
         if raw_price:
             try:
-                price = Decimal(raw_price)
-            except InvalidOperation:
+                price = float(raw_price)
+            except ValueError:
                 return redirect(url_for("items_page"))
 
         if raw_vat_amount:
             try:
-                vat_amount = Decimal(raw_vat_amount)
-            except InvalidOperation:
+                vat_amount = float(raw_vat_amount)
+            except ValueError:
                 return redirect(url_for("items_page"))
 
         normalized_unit = unit or None
         normalized_description = description or None
 
-        item_number = _generate_item_number(db)
-        db.execute(
-            """
-            INSERT INTO items (item_number, name, price, vat_amount, unit, description)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (
-                item_number,
-                name,
-                float(price) if price is not None else None,
-                float(vat_amount) if vat_amount is not None else None,
-                normalized_unit,
-                normalized_description,
-            ),
-        )
-        db.commit()
+        item_number = _generate_item_number()
+        with db:
+            db.execute(
+                """
+                INSERT INTO items (item_number, name, price, vat_amount, unit, description)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    item_number,
+                    name,
+                    price,
+                    vat_amount,
+                    normalized_unit,
+                    normalized_description,
+                ),
+            )
         return redirect(url_for("items_page"))
 
     @app.post("/items/edit")
     def edit_item():
         db = get_db()
-        ensure_items_table()
 
         item_id = request.form.get("item_id", "").strip()
         name = request.form.get("name", "").strip()
@@ -1087,41 +1193,40 @@ def create_app(test_config=None):
 
         if raw_price:
             try:
-                price = Decimal(raw_price)
-            except InvalidOperation:
+                price = float(raw_price)
+            except ValueError:
                 return redirect(url_for("items_page"))
 
         if raw_vat_amount:
             try:
-                vat_amount = Decimal(raw_vat_amount)
-            except InvalidOperation:
+                vat_amount = float(raw_vat_amount)
+            except ValueError:
                 return redirect(url_for("items_page"))
 
         normalized_unit = unit or None
         normalized_description = description or None
 
-        db.execute(
-            """
-            UPDATE items
-            SET name = ?, price = ?, vat_amount = ?, unit = ?, description = ?
-            WHERE id = ?
-            """,
-            (
-                name,
-                float(price) if price is not None else None,
-                float(vat_amount) if vat_amount is not None else None,
-                normalized_unit,
-                normalized_description,
-                parsed_item_id,
-            ),
-        )
-        db.commit()
+        with db:
+            db.execute(
+                """
+                UPDATE items
+                SET name = ?, price = ?, vat_amount = ?, unit = ?, description = ?
+                WHERE id = ?
+                """,
+                (
+                    name,
+                    price,
+                    vat_amount,
+                    normalized_unit,
+                    normalized_description,
+                    parsed_item_id,
+                ),
+            )
         return redirect(url_for("items_page"))
 
     @app.post("/items/delete")
     def delete_item():
         db = get_db()
-        ensure_items_table()
 
         item_id = request.form.get("item_id", "").strip()
         try:
@@ -1129,17 +1234,46 @@ def create_app(test_config=None):
         except ValueError:
             return redirect(url_for("items_page"))
 
-        db.execute("DELETE FROM items WHERE id = ?", (parsed_item_id,))
-        db.commit()
+        with db:
+            db.execute("DELETE FROM items WHERE id = ?", (parsed_item_id,))
         return redirect(url_for("items_page"))
 
     @app.route("/customers")
     def customers_page():
         db = get_db()
-        ensure_customers_table()
         search_query = request.args.get("q", "").strip()
 
-        if search_query:
+        try:
+            before_id = int(request.args.get("before_id", "").strip())
+        except ValueError:
+            before_id = None
+
+        page_size = 50
+
+        if SEARCH_INDEX_AVAILABLE and len(search_query) >= 3:
+            customers = db.execute(
+                """
+                SELECT
+                    id,
+                    customer_number,
+                    customer_type,
+                    customer_name,
+                    customer_tax_number,
+                    registration_name,
+                    phone_number,
+                    address,
+                    website,
+                    country,
+                    address_2
+                FROM customers
+                WHERE id IN (SELECT rowid FROM customers_fts WHERE customers_fts MATCH ?)
+                  AND (? IS NULL OR id < ?)
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (_fts_phrase(search_query), before_id, before_id, page_size + 1),
+            ).fetchall()
+        elif search_query:
             like_query = f"%{search_query}%"
             customers = db.execute(
                 """
@@ -1156,7 +1290,7 @@ def create_app(test_config=None):
                     country,
                     address_2
                 FROM customers
-                WHERE customer_number LIKE ?
+                WHERE (customer_number LIKE ?
                          OR customer_type LIKE ?
                    OR customer_name LIKE ?
                    OR customer_tax_number LIKE ?
@@ -1165,8 +1299,10 @@ def create_app(test_config=None):
                    OR address LIKE ?
                    OR website LIKE ?
                    OR country LIKE ?
-                   OR address_2 LIKE ?
+                   OR address_2 LIKE ?)
+                  AND (? IS NULL OR id < ?)
                 ORDER BY id DESC
+                LIMIT ?
                 """,
                 (
                     like_query,
@@ -1179,6 +1315,9 @@ def create_app(test_config=None):
                     like_query,
                     like_query,
                     like_query,
+                    before_id,
+                    before_id,
+                    page_size + 1,
                 ),
             ).fetchall()
         else:
@@ -1197,22 +1336,31 @@ def create_app(test_config=None):
                     country,
                     address_2
                 FROM customers
+                WHERE (? IS NULL OR id < ?)
                 ORDER BY id DESC
-                """
+                LIMIT ?
+                """,
+                (before_id, before_id, page_size + 1),
             ).fetchall()
 
+        next_before_id = None
+        if len(customers) > page_size:
+            customers = customers[:page_size]
+            next_before_id = customers[-1]["id"]
+
         return render_template(
             "customers.html",
             page_title="Customers",
             active_menu="customers",
             customers=customers,
             search_query=search_query,
+            before_id=before_id,
+            next_before_id=next_before_id,
         )
 
     @app.post("/customers/add")
     def add_customer():
         db = get_db()
-        ensure_customers_table()
 
         customer_type = request.form.get("customer_type", "Company").strip() or "Company"
         if customer_type not in {"Company", "individual"}:
@@ -1230,43 +1378,42 @@ def create_app(test_config=None):
         if not customer_name:
             return redirect(url_for("customers_page"))
 
-        customer_number = _generate_customer_number(db)
-        db.execute(
-            """
-            INSERT INTO customers (
-                customer_number,
-                customer_type,
-                customer_name,
-                customer_tax_number,
-                registration_name,
-                phone_number,
-                address,
-                website,
-                country,
-                address_2
+        customer_number = _generate_customer_number()
+        with db:
+            db.execute(
+                """
+                INSERT INTO customers (
+                    customer_number,
+                    customer_type,
+                    customer_name,
+                    customer_tax_number,
+                    registration_name,
+                    phone_number,
+                    address,
+                    website,
+                    country,
+                    address_2
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    customer_number,
+                    customer_type,
+                    customer_name,
+                    customer_tax_number,
+                    registration_name,
+                    phone_number,
+                    address,
+                    website,
+                    country,
+                    address_2,
+                ),
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                customer_number,
-                customer_type,
-                customer_name,
-                customer_tax_number,
-                registration_name,
-                phone_number,
-                address,
-                website,
-                country,
-                address_2,
-            ),
-        )
-        db.commit()
         return redirect(url_for("customers_page"))
 
     @app.post("/customers/edit")
     def edit_customer():
         db = get_db()
-        ensure_customers_table()
 
         customer_id = request.form.get("customer_id", "").strip()
         customer_type = request.form.get("customer_type", "Company").strip() or "Company"
@@ -1290,40 +1437,39 @@ def create_app(test_config=None):
         except ValueError:
             return redirect(url_for("customers_page"))
 
-        db.execute(
-            """
-            UPDATE customers
-            SET customer_type = ?,
-                customer_name = ?,
-                customer_tax_number = ?,
-                registration_name = ?,
-                phone_number = ?,
-                address = ?,
-                website = ?,
-                country = ?,
-                address_2 = ?
-            WHERE id = ?
-            """,
-            (
-                customer_type,
-                customer_name,
-                customer_tax_number,
-                registration_name,
-                phone_number,
-                address,
-                website,
-                country,
-                address_2,
-                parsed_customer_id,
-            ),
-        )
-        db.commit()
+        with db:
+            db.execute(
+                """
+                UPDATE customers
+                SET customer_type = ?,
+                    customer_name = ?,
+                    customer_tax_number = ?,
+                    registration_name = ?,
+                    phone_number = ?,
+                    address = ?,
+                    website = ?,
+                    country = ?,
+                    address_2 = ?
+                WHERE id = ?
+                """,
+                (
+                    customer_type,
+                    customer_name,
+                    customer_tax_number,
+                    registration_name,
+                    phone_number,
+                    address,
+                    website,
+                    country,
+                    address_2,
+                    parsed_customer_id,
+                ),
+            )
         return redirect(url_for("customers_page"))
 
     @app.post("/customers/delete")
     def delete_customer():
         db = get_db()
-        ensure_customers_table()
 
         customer_id = request.form.get("customer_id", "").strip()
         try:
@@ -1331,17 +1477,46 @@ def create_app(test_config=None):
         except ValueError:
             return redirect(url_for("customers_page"))
 
-        db.execute("DELETE FROM customers WHERE id = ?", (parsed_customer_id,))
-        db.commit()
+        with db:
+            db.execute("DELETE FROM customers WHERE id = ?", (parsed_customer_id,))
         return redirect(url_for("customers_page"))
 
     @app.route("/vendors")
     def vendors_page():
         db = get_db()
-        ensure_vendors_table()
         search_query = request.args.get("q", "").strip()
 
-        if search_query:
+        try:
+            before_id = int(request.args.get("before_id", "").strip())
+        except ValueError:
+            before_id = None
+
+        page_size = 50
+
+        if SEARCH_INDEX_AVAILABLE and len(search_query) >= 3:
+            vendors = db.execute(
+                """
+                SELECT
+                    id,
+                    vendor_number,
+                    vendor_type,
+                    vendor_name,
+                    vendor_tax_number,
+                    registration_name,
+                    phone_number,
+                    address,
+                    website,
+                    country,
+                    address_2
+                FROM vendors
+                WHERE id IN (SELECT rowid FROM vendors_fts WHERE vendors_fts MATCH ?)
+                  AND (? IS NULL OR id < ?)
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (_fts_phrase(search_query), before_id, before_id, page_size + 1),
+            ).fetchall()
+        elif search_query:
             like_query = f"%{search_query}%"
             vendors = db.execute(
                 """
@@ -1358,7 +1533,7 @@ def create_app(test_config=None):
                     country,
                     address_2
                 FROM vendors
-                WHERE vendor_number LIKE ?
+                WHERE (vendor_number LIKE ?
                    OR vendor_type LIKE ?
                    OR vendor_name LIKE ?
                    OR vendor_tax_number LIKE ?
@@ -1367,8 +1542,10 @@ def create_app(test_config=None):
                    OR address LIKE ?
                    OR website LIKE ?
                    OR country LIKE ?
-                   OR address_2 LIKE ?
+                   OR address_2 LIKE ?)
+                  AND (? IS NULL OR id < ?)
                 ORDER BY id DESC
+                LIMIT ?
                 """,
                 (
                     like_query,
@@ -1381,6 +1558,9 @@ def create_app(test_config=None):
                     like_query,
                     like_query,
                     like_query,
+                    before_id,
+                    before_id,
+                    page_size + 1,
                 ),
             ).fetchall()
         else:
@@ -1399,22 +1579,31 @@ def create_app(test_config=None):
                     country,
                     address_2
                 FROM vendors
+                WHERE (? IS NULL OR id < ?)
                 ORDER BY id DESC
-                """
+                LIMIT ?
+                """,
+                (before_id, before_id, page_size + 1),
             ).fetchall()
 
+        next_before_id = None
+        if len(vendors) > page_size:
+            vendors = vendors[:page_size]
+            next_before_id = vendors[-1]["id"]
+
         return render_template(
             "vendors.html",
             page_title="Vendors",
             active_menu="Vendors",
             vendors=vendors,
             search_query=search_query,
+            before_id=before_id,
+            next_before_id=next_before_id,
         )
 
     @app.post("/vendors/add")
     def add_vendor():
         db = get_db()
-        ensure_vendors_table()
 
         vendor_type = request.form.get("vendor_type", "Company").strip() or "Company"
         if vendor_type not in {"Company", "individual"}:
@@ -1432,43 +1621,42 @@ def create_app(test_config=None):
         if not vendor_name:
             return redirect(url_for("vendors_page"))
 
-        vendor_number = _generate_vendor_number(db)
-        db.execute(
-            """
-            INSERT INTO vendors (
-                vendor_number,
-                vendor_type,
-                vendor_name,
-                vendor_tax_number,
-                registration_name,
-                phone_number,
-                address,
-                website,
-                country,
-                address_2
+        vendor_number = _generate_vendor_number()
+        with db:
+            db.execute(
+                """
+                INSERT INTO vendors (
+                    vendor_number,
+                    vendor_type,
+                    vendor_name,
+                    vendor_tax_number,
+                    registration_name,
+                    phone_number,
+                    address,
+                    website,
+                    country,
+                    address_2
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    vendor_number,
+                    vendor_type,
+                    vendor_name,
+                    vendor_tax_number,
+                    registration_name,
+                    phone_number,
+                    address,
+                    website,
+                    country,
+                    address_2,
+                ),
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                vendor_number,
-                vendor_type,
-                vendor_name,
-                vendor_tax_number,
-                registration_name,
-                phone_number,
-                address,
-                website,
-                country,
-                address_2,
-            ),
-        )
-        db.commit()
         return redirect(url_for("vendors_page"))
 
     @app.post("/vendors/edit")
     def edit_vendor():
         db = get_db()
-        ensure_vendors_table()
 
         vendor_id = request.form.get("vendor_id", "").strip()
         vendor_type = request.form.get("vendor_type", "Company").strip() or "Company"
@@ -1492,40 +1680,39 @@ def create_app(test_config=None):
         except ValueError:
             return redirect(url_for("vendors_page"))
 
-        db.execute(
-            """
-            UPDATE vendors
-            SET vendor_type = ?,
-                vendor_name = ?,
-                vendor_tax_number = ?,
-                registration_name = ?,
-                phone_number = ?,
-                address = ?,
-                website = ?,
-                country = ?,
-                address_2 = ?
-            WHERE id = ?
-            """,
-            (
-                vendor_type,
-                vendor_name,
-                vendor_tax_number,
-                registration_name,
-                phone_number,
-                address,
-                website,
-                country,
-                address_2,
-                parsed_vendor_id,
-            ),
-        )
-        db.commit()
+        with db:
+            db.execute(
+                """
+                UPDATE vendors
+                SET vendor_type = ?,
+                    vendor_name = ?,
+                    vendor_tax_number = ?,
+                    registration_name = ?,
+                    phone_number = ?,
+                    address = ?,
+                    website = ?,
+                    country = ?,
+                    address_2 = ?
+                WHERE id = ?
+                """,
+                (
+                    vendor_type,
+                    vendor_name,
+                    vendor_tax_number,
+                    registration_name,
+                    phone_number,
+                    address,
+                    website,
+                    country,
+                    address_2,
+                    parsed_vendor_id,
+                ),
+            )
         return redirect(url_for("vendors_page"))
 
     @app.post("/vendors/delete")
     def delete_vendor():
         db = get_db()
-        ensure_vendors_table()
 
         vendor_id = request.form.get("vendor_id", "").strip()
         try:
@@ -1533,82 +1720,147 @@ def create_app(test_config=None):
         except ValueError:
             return redirect(url_for("vendors_page"))
 
-        db.execute("DELETE FROM vendors WHERE id = ?", (parsed_vendor_id,))
-        db.commit()
+        with db:
+            db.execute("DELETE FROM vendors WHERE id = ?", (parsed_vendor_id,))
         return redirect(url_for("vendors_page"))
 
     @app.route("/invoices")
     def invoices_page():
         db = get_db()
-        ensure_invoices_tables()
-        ensure_payment_tables()
         search_query = request.args.get("q", "").strip()
 
-        payment_methods = db.execute(
-            """
-            SELECT id, name, method_type
-            FROM payment_methods
-            ORDER BY name ASC
-            """
-        ).fetchall()
+        try:
+            before_id = int(request.args.get("before_id", "").strip())
+        except ValueError:
+            before_id = None
 
-        if search_query:
+        page_size = 50
+
+        payment_methods = _get_payment_method_options(db)
+
+        if SEARCH_INDEX_AVAILABLE and len(search_query) >= 3:
+            invoices = db.execute(
+                """
+                SELECT
+                    id,
+                    invoice_number,
+                    invoice_date,
+                    customer_name,
+                    total,
+                    paid_amount,
+                    CASE
+                        WHEN total - paid_amount > 0 THEN total - paid_amount
+                        ELSE 0
+                    END AS outstanding_amount
+                FROM (
+                    SELECT
+                        i.id,
+                        i.invoice_number,
+                        i.invoice_date,
+                        i.customer_name,
+                        i.total,
+                        COALESCE((
+                            SELECT SUM(pt.amount)
+                            FROM payment_transactions pt
+                            WHERE pt.reference_type = 'invoice'
+                              AND pt.transaction_type = 'invoice_receipt'
+                              AND pt.reference_id = i.id
+                        ), 0) AS paid_amount
+                    FROM invoices i
+                    WHERE i.id IN (SELECT rowid FROM invoices_fts WHERE invoices_fts MATCH ?)
+                      AND (? IS NULL OR i.id < ?)
+                    ORDER BY i.id DESC
+                    LIMIT ?
+                )
+                ORDER BY id DESC
+                """,
+                (_fts_phrase(search_query), before_id, before_id, page_size + 1),
+            ).fetchall()
+        elif search_query:
             like_query = f"%{search_query}%"
             invoices = db.execute(
                 """
                 SELECT
-                    i.id,
-                    i.invoice_number,
-                    i.invoice_date,
-                    i.customer_name,
-                    i.total,
-                    COALESCE(r.received_amount, 0) AS paid_amount,
-                    MAX(i.total - COALESCE(r.received_amount, 0), 0) AS outstanding_amount
-                FROM invoices i
-                LEFT JOIN (
-                    SELECT reference_id, SUM(amount) AS received_amount
-                    FROM payment_transactions
-                    WHERE reference_type = 'invoice'
-                      AND transaction_type = 'invoice_receipt'
-                    GROUP BY reference_id
-                ) r ON r.reference_id = i.id
-                WHERE i.invoice_number LIKE ?
-                   OR i.invoice_date LIKE ?
-                   OR i.customer_name LIKE ?
-                ORDER BY i.id DESC
+                    id,
+                    invoice_number,
+                    invoice_date,
+                    customer_name,
+                    total,
+                    paid_amount,
+                    CASE
+                        WHEN total - paid_amount > 0 THEN total - paid_amount
+                        ELSE 0
+                    END AS outstanding_amount
+                FROM (
+                    SELECT
+                        i.id,
+                        i.invoice_number,
+                        i.invoice_date,
+                        i.customer_name,
+                        i.total,
+                        COALESCE((
+                            SELECT SUM(pt.amount)
+                            FROM payment_transactions pt
+                            WHERE pt.reference_type = 'invoice'
+                              AND pt.transaction_type = 'invoice_receipt'
+                              AND pt.reference_id = i.id
+                        ), 0) AS paid_amount
+                    FROM invoices i
+                    WHERE (i.invoice_number LIKE ?
+                       OR i.invoice_date LIKE ?
+                       OR i.customer_name LIKE ?)
+                      AND (? IS NULL OR i.id < ?)
+                    ORDER BY i.id DESC
+                    LIMIT ?
+                )
+                ORDER BY id DESC
                 """,
-                (like_query, like_query, like_query),
+                (like_query, like_query, like_query, before_id, before_id, page_size + 1),
             ).fetchall()
         else:
             invoices = db.execute(
                 """
                 SELECT
-                    i.id,
-                    i.invoice_number,
-                    i.invoice_date,
-                    i.customer_name,
-                    i.total,
-                    COALESCE(r.received_amount, 0) AS paid_amount,
-                    MAX(i.total - COALESCE(r.received_amount, 0), 0) AS outstanding_amount
-                FROM invoices i
-                LEFT JOIN (
-                    SELECT reference_id, SUM(amount) AS received_amount
-                    FROM payment_transactions
-                    WHERE reference_type = 'invoice'
-                      AND transaction_type = 'invoice_receipt'
-                    GROUP BY reference_id
-                ) r ON r.reference_id = i.id
-                ORDER BY i.id DESC
-                """
+                    id,
+                    invoice_number,
+                    invoice_date,
+                    customer_name,
+                    total,
+                    paid_amount,
+                    CASE
+                        WHEN total - paid_amount > 0 THEN total - paid_amount
+                        ELSE 0
+                    END AS outstanding_amount
+                FROM (
+                    SELECT
+                        i.id,
+                        i.invoice_number,
+                        i.invoice_date,
+                        i.customer_name,
+                        i.total,
+                        COALESCE((
+                            SELECT SUM(pt.amount)
+                            FROM payment_transactions pt
+                            WHERE pt.reference_type = 'invoice'
+                              AND pt.transaction_type = 'invoice_receipt'
+                              AND pt.reference_id = i.id
+                        ), 0) AS paid_amount
+                    FROM invoices i
+                    WHERE (? IS NULL OR i.id < ?)
+                    ORDER BY i.id DESC
+                    LIMIT ?
+                )
+                ORDER BY id DESC
+                """,
+                (before_id, before_id, page_size + 1),
             ).fetchall()
 
-        currencies = db.execute(
-            """
-            SELECT code, name
-            FROM payment_currencies
-            ORDER BY code ASC
-            """
-        ).fetchall()
+        next_before_id = None
+        if len(invoices) > page_size:
+            invoices = invoices[:page_size]
+            next_before_id = invoices[-1]["id"]
+
+        currencies = _get_currency_options(db)
         return render_template(
             "invoices.html",
             page_title="Invoices",
@@ -1617,13 +1869,13 @@ def create_app(test_config=None):
             payment_methods=payment_methods,
             currencies=currencies,
             search_query=search_query,
+            before_id=before_id,
+            next_before_id=next_before_id,
         )
 
     @app.post("/invoices/pay")
     def pay_invoice():
         db = get_db()
-        ensure_invoices_tables()
-        ensure_payment_tables()
 
         invoice_id = request.form.get("invoice_id", "").strip()
         payment_method_id = request.form.get("payment_method_id", "").strip()
@@ -1637,26 +1889,29 @@ def create_app(test_config=None):
         except ValueError:
             return redirect(url_for("invoices_page"))
 
-        invoice = db.execute("SELECT id, invoice_number, total FROM invoices WHERE id = ?", (parsed_invoice_id,)).fetchone()
-        if invoice is None:
-            return redirect(url_for("invoices_page"))
-
-        method = db.execute("SELECT id FROM payment_methods WHERE id = ?", (parsed_payment_method_id,)).fetchone()
-        if method is None:
-            return redirect(url_for("invoices_page"))
-
-        received_raw = db.execute(
+        invoice = db.execute(
             """
-            SELECT COALESCE(SUM(amount), 0) AS total
-            FROM payment_transactions
-            WHERE reference_type = 'invoice'
-              AND transaction_type = 'invoice_receipt'
-              AND reference_id = ?
+            SELECT
+                i.id,
+                i.invoice_number,
+                i.total,
+                (
+                    SELECT COALESCE(SUM(amount), 0)
+                    FROM payment_transactions
+                    WHERE reference_type = 'invoice'
+                      AND transaction_type = 'invoice_receipt'
+                      AND reference_id = i.id
+                ) AS received_amount,
+                EXISTS (SELECT 1 FROM payment_methods WHERE id = ?) AS method_exists
+            FROM invoices i
+            WHERE i.id = ?
             """,
-            (parsed_invoice_id,),
+            (parsed_payment_method_id, parsed_invoice_id),
         ).fetchone()
+        if invoice is None or not invoice["method_exists"]:
+            return redirect(url_for("invoices_page"))
 
-        outstanding = Decimal(str(invoice["total"] or 0)) - Decimal(str(received_raw["total"] or 0))
+        outstanding = Decimal(str(invoice["total"] or 0)) - Decimal(str(invoice["received_amount"] or 0))
         if outstanding <= 0:
             return redirect(url_for("invoices_page"))
 
@@ -1667,64 +1922,44 @@ def create_app(test_config=None):
 
         currency_code = _get_default_currency_code(db)
         transaction_notes = notes or f"Invoice payment received for {invoice['invoice_number']}"
-        db.execute(
-            """
-            INSERT INTO payment_transactions (
-                transaction_date,
-                transaction_type,
-                reference_type,
-                reference_id,
-                amount,
-                currency_code,
-                method_id,
-                notes
+        with db:
+            db.execute(
+                """
+                INSERT INTO payment_transactions (
+                    transaction_date,
+                    transaction_type,
+                    reference_type,
+                    reference_id,
+                    amount,
+                    currency_code,
+                    method_id,
+                    notes
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    payment_date,
+                    "invoice_receipt",
+                    "invoice",
+                    parsed_invoice_id,
+                    float(amount),
+                    currency_code,
+                    parsed_payment_method_id,
+                    transaction_notes,
+                ),
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                payment_date,
-                "invoice_receipt",
-                "invoice",
-                parsed_invoice_id,
-                float(amount),
-                currency_code,
-                parsed_payment_method_id,
-                transaction_notes,
-            ),
-        )
-        db.commit()
         return redirect(url_for("invoices_page"))
 
     @app.route("/invoices/new")
     def new_invoice_page():
         db = get_db()
-        ensure_invoices_tables()
-        customers = db.execute(
-            """
-            SELECT id, customer_name, customer_tax_number, registration_name,
-                   phone_number, address, website, country, address_2
-            FROM customers
-            ORDER BY id DESC
-            """
-        ).fetchall()
-        items = db.execute(
-            """
-            SELECT id, name, unit, price, vat_amount
-            FROM items
-            ORDER BY id DESC
-            """
-        ).fetchall()
+        customers = _get_customer_options(db)
+        items = _get_item_options(db)
 
         # Get default currency code
         currency_code = _get_default_currency_code(db)
         invoice = type('InvoiceObj', (), {'currency_code': currency_code})()
-        currencies = db.execute(
-            """
-            SELECT code, name
-            FROM payment_currencies
-            ORDER BY code ASC
-            """
-        ).fetchall()
+        currencies = _get_currency_options(db)
         return render_template(
             "invoice_form.html",
             page_title="Add Invoice",
@@ -1735,30 +1970,35 @@ def create_app(test_config=None):
             customers=customers,
             items_catalog=items,
             currencies=currencies,
-            generated_invoice_number=_generate_invoice_number(db),
+            generated_invoice_number=_generate_invoice_number(),
         )
 
     @app.post("/invoices/add")
     def add_invoice():
         db = get_db()
-        ensure_invoices_tables()
 
         invoice_number = _ensure_unique_invoice_number(db, request.form.get("invoice_number"))
         invoice_date = request.form.get("invoice_date", "").strip()
         customer_id = request.form.get("customer_id", "").strip()
 
-        customer_name = request.form.get("customer_name", "").strip() or None
-        customer_tax_number = request.form.get("customer_tax_number", "").strip() or None
-        registration_name = request.form.get("registration_name", "").strip() or None
-        phone_number = request.form.get("phone_number", "").strip() or None
-        address = request.form.get("address", "").strip() or None
-        website = request.form.get("website", "").strip() or None
-        country = request.form.get("country", "").strip() or None
-        address_2 = request.form.get("address_2", "").strip() or None
+        (
+            customer_name,
+            customer_tax_number,
+            registration_name,
+            phone_number,
+            address,
+            website,
+            country,
+            address_2,
+        ) = _optional_form_values(request.form, _CUSTOMER_FIELDS)
 
         if not invoice_date:
             return redirect(url_for("new_invoice_page"))
 
+        item_rows, subtotal, vat_total = _parse_line_items(request.form)
+        if not item_rows:
+            return redirect(url_for("new_invoice_page"))
+
         parsed_customer_id = None
         if customer_id:
             try:
@@ -1767,112 +2007,52 @@ def create_app(test_config=None):
                 parsed_customer_id = None
 
         currency_code = request.form.get("currency_code", "").strip().upper() or _get_default_currency_code(db)
-        db.execute(
-            """
-            INSERT INTO invoices (
-                invoice_number, invoice_date, customer_id,
-                customer_name, customer_tax_number, registration_name,
-                phone_number, address, website, country, address_2,
-                subtotal, vat_total, total, currency_code
+        total = subtotal + vat_total
+        with db:
+            cursor = db.execute(
+                """
+                INSERT INTO invoices (
+                    invoice_number, invoice_date, customer_id,
+                    customer_name, customer_tax_number, registration_name,
+                    phone_number, address, website, country, address_2,
+                    subtotal, vat_total, total, currency_code
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    invoice_number,
+                    invoice_date,
+                    parsed_customer_id,
+                    customer_name,
+                    customer_tax_number,
+                    registration_name,
+                    phone_number,
+                    address,
+                    website,
+                    country,
+                    address_2,
+                    float(subtotal),
+                    float(vat_total),
+                    float(total),
+                    currency_code,
+                ),
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 0, 0, ?)
-            """,
-            (
-                invoice_number,
-                invoice_date,
-                parsed_customer_id,
-                customer_name,
-                customer_tax_number,
-                registration_name,
-                phone_number,
-                address,
-                website,
-                country,
-                address_2,
-                currency_code,
-            ),
-        )
-        invoice_id = db.execute("SELECT last_insert_rowid()").fetchone()[0]
-
-        item_ids = request.form.getlist("item_id[]")
-        item_names = request.form.getlist("item_name[]")
-        quantities = request.form.getlist("quantity[]")
-        units = request.form.getlist("unit[]")
-        prices = request.form.getlist("price[]")
-        vat_amounts = request.form.getlist("vat_amount[]")
-
-        subtotal = Decimal("0")
-        vat_total = Decimal("0")
-
-        max_len = max(
-            len(item_ids),
-            len(item_names),
-            len(quantities),
-            len(units),
-            len(prices),
-            len(vat_amounts),
-            0,
-        )
-
-        for index in range(max_len):
-            raw_name = item_names[index].strip() if index < len(item_names) else ""
-            raw_quantity = quantities[index] if index < len(quantities) else ""
-            raw_unit = units[index].strip() if index < len(units) else ""
-            raw_price = prices[index] if index < len(prices) else ""
-            raw_vat = vat_amounts[index] if index < len(vat_amounts) else ""
-            raw_item_id = item_ids[index].strip() if index < len(item_ids) else ""
-
-            if not raw_name:
-                continue
-
-            quantity = _to_decimal_or_default(raw_quantity, "1")
-            price = _to_decimal_or_default(raw_price, "0")
-            vat_percentage = _to_decimal_or_default(raw_vat, "0")
-            line_net = quantity * price
-            vat_value = (line_net * vat_percentage) / Decimal("100")
-            line_total = line_net + vat_value
-
-            parsed_item_id = None
-            if raw_item_id:
-                try:
-                    parsed_item_id = int(raw_item_id)
-                except ValueError:
-                    parsed_item_id = None
+            invoice_id = cursor.lastrowid
 
-            db.execute(
+            db.executemany(
                 """
                 INSERT INTO invoice_items (
                     invoice_id, item_id, item_name, quantity, unit, price, vat_amount, line_total
                 )
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 """,
-                (
-                    invoice_id,
-                    parsed_item_id,
-                    raw_name,
-                    float(quantity),
-                    raw_unit or "1",
-                    float(price),
-                    float(vat_percentage),
-                    float(line_total),
-                ),
+                [(invoice_id,) + row for row in item_rows],
             )
-
-            subtotal += line_net
-            vat_total += vat_value
-
-        total = subtotal + vat_total
-        db.execute(
-            "UPDATE invoices SET subtotal = ?, vat_total = ?, total = ? WHERE id = ?",
-            (float(subtotal), float(vat_total), float(total), invoice_id),
-        )
-        db.commit()
         return redirect(url_for("view_invoice_page", invoice_id=invoice_id))
 
     @app.route("/invoices/<int:invoice_id>/edit")
     def edit_invoice_page(invoice_id):
         db = get_db()
-        ensure_invoices_tables()
 
         invoice = db.execute(
             "SELECT * FROM invoices WHERE id = ?",
@@ -1891,29 +2071,10 @@ def create_app(test_config=None):
             (invoice_id,),
         ).fetchall()
 
-        customers = db.execute(
-            """
-            SELECT id, customer_name, customer_tax_number, registration_name,
-                   phone_number, address, website, country, address_2
-            FROM customers
-            ORDER BY id DESC
-            """
-        ).fetchall()
-        items = db.execute(
-            """
-            SELECT id, name, unit, price, vat_amount
-            FROM items
-            ORDER BY id DESC
-            """
-        ).fetchall()
+        customers = _get_customer_options(db)
+        items = _get_item_options(db)
 
-        currencies = db.execute(
-            """
-            SELECT code, name
-            FROM payment_currencies
-            ORDER BY code ASC
-            """
-        ).fetchall()
+        currencies = _get_currency_options(db)
         return render_template(
             "invoice_form.html",
             page_title="Edit Invoice",
@@ -1930,7 +2091,6 @@ def create_app(test_config=None):
     @app.post("/invoices/<int:invoice_id>/edit")
     def update_invoice(invoice_id):
         db = get_db()
-        ensure_invoices_tables()
 
         invoice = db.execute("SELECT id FROM invoices WHERE id = ?", (invoice_id,)).fetchone()
         if invoice is None:
@@ -1945,6 +2105,10 @@ def create_app(test_config=None):
         if not invoice_date:
             return redirect(url_for("edit_invoice_page", invoice_id=invoice_id))
 
+        item_rows, subtotal, vat_total = _parse_line_items(request.form)
+        if not item_rows:
+            return redirect(url_for("edit_invoice_page", invoice_id=invoice_id))
+
         customer_id = request.form.get("customer_id", "").strip()
         parsed_customer_id = None
         if customer_id:
@@ -1953,123 +2117,89 @@ def create_app(test_config=None):
             except ValueError:
                 parsed_customer_id = None
 
-        customer_name = request.form.get("customer_name", "").strip() or None
-        customer_tax_number = request.form.get("customer_tax_number", "").strip() or None
-        registration_name = request.form.get("registration_name", "").strip() or None
-        phone_number = request.form.get("phone_number", "").strip() or None
-        address = request.form.get("address", "").strip() or None
-        website = request.form.get("website", "").strip() or None
-        country = request.form.get("country", "").strip() or None
-        address_2 = request.form.get("address_2", "").strip() or None
+        (
+            customer_name,
+            customer_tax_number,
+            registration_name,
+            phone_number,
+            address,
+            website,
+            country,
+            address_2,
+        ) = _optional_form_values(request.form, _CUSTOMER_FIELDS)
 
         currency_code = request.form.get("currency_code", "").strip().upper() or _get_default_currency_code(db)
-        db.execute(
+        total = subtotal + vat_total
+        existing_lines = db.execute(
             """
-            UPDATE invoices
-            SET invoice_number = ?, invoice_date = ?, customer_id = ?,
-                customer_name = ?, customer_tax_number = ?, registration_name = ?,
-                phone_number = ?, address = ?, website = ?, country = ?, address_2 = ?,
-                currency_code = ?
-            WHERE id = ?
+            SELECT id, item_id, item_name, quantity, unit, price, vat_amount, line_total
+            FROM invoice_items
+            WHERE invoice_id = ?
+            ORDER BY id ASC
             """,
-            (
-                invoice_number,
-                invoice_date,
-                parsed_customer_id,
-                customer_name,
-                customer_tax_number,
-                registration_name,
-                phone_number,
-                address,
-                website,
-                country,
-                address_2,
-                currency_code,
-                invoice_id,
-            ),
-        )
-
-        db.execute("DELETE FROM invoice_items WHERE invoice_id = ?", (invoice_id,))
-
-        item_ids = request.form.getlist("item_id[]")
-        item_names = request.form.getlist("item_name[]")
-        quantities = request.form.getlist("quantity[]")
-        units = request.form.getlist("unit[]")
-        prices = request.form.getlist("price[]")
-        vat_amounts = request.form.getlist("vat_amount[]")
-
-        subtotal = Decimal("0")
-        vat_total = Decimal("0")
-
-        max_len = max(
-            len(item_ids),
-            len(item_names),
-            len(quantities),
-            len(units),
-            len(prices),
-            len(vat_amounts),
-            0,
-        )
-
-        for index in range(max_len):
-            raw_name = item_names[index].strip() if index < len(item_names) else ""
-            raw_quantity = quantities[index] if index < len(quantities) else ""
-            raw_unit = units[index].strip() if index < len(units) else ""
-            raw_price = prices[index] if index < len(prices) else ""
-            raw_vat = vat_amounts[index] if index < len(vat_amounts) else ""
-            raw_item_id = item_ids[index].strip() if index < len(item_ids) else ""
-
-            if not raw_name:
-                continue
-
-            quantity = _to_decimal_or_default(raw_quantity, "1")
-            price = _to_decimal_or_default(raw_price, "0")
-            vat_percentage = _to_decimal_or_default(raw_vat, "0")
-            line_net = quantity * price
-            vat_value = (line_net * vat_percentage) / Decimal("100")
-            line_total = line_net + vat_value
-
-            parsed_item_id = None
-            if raw_item_id:
-                try:
-                    parsed_item_id = int(raw_item_id)
-                except ValueError:
-                    parsed_item_id = None
+            (invoice_id,),
+        ).fetchall()
+        changed_rows = [
+            row + (line["id"],)
+            for line, row in zip(existing_lines, item_rows)
+            if tuple(line)[1:] != row
+        ]
+        new_rows = [(invoice_id,) + row for row in item_rows[len(existing_lines):]]
+        stale_ids = [(line["id"],) for line in existing_lines[len(item_rows):]]
 
+        with db:
             db.execute(
                 """
-                INSERT INTO invoice_items (
-                    invoice_id, item_id, item_name, quantity, unit, price, vat_amount, line_total
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                UPDATE invoices
+                SET invoice_number = ?, invoice_date = ?, customer_id = ?,
+                    customer_name = ?, customer_tax_number = ?, registration_name = ?,
+                    phone_number = ?, address = ?, website = ?, country = ?, address_2 = ?,
+                    currency_code = ?, subtotal = ?, vat_total = ?, total = ?
+                WHERE id = ?
                 """,
                 (
+                    invoice_number,
+                    invoice_date,
+                    parsed_customer_id,
+                    customer_name,
+                    customer_tax_number,
+                    registration_name,
+                    phone_number,
+                    address,
+                    website,
+                    country,
+                    address_2,
+                    currency_code,
+                    float(subtotal),
+                    float(vat_total),
+                    float(total),
                     invoice_id,
-                    parsed_item_id,
-                    raw_name,
-                    float(quantity),
-                    raw_unit or "1",
-                    float(price),
-                    float(vat_percentage),
-                    float(line_total),
                 ),
             )
 
-            subtotal += line_net
-            vat_total += vat_value
-
-        total = subtotal + vat_total
-        db.execute(
-            "UPDATE invoices SET subtotal = ?, vat_total = ?, total = ? WHERE id = ?",
-            (float(subtotal), float(vat_total), float(total), invoice_id),
-        )
-        db.commit()
+            db.executemany("DELETE FROM invoice_items WHERE id = ?", stale_ids)
+            db.executemany(
+                """
+                UPDATE invoice_items
+                SET item_id = ?, item_name = ?, quantity = ?, unit = ?, price = ?, vat_amount = ?, line_total = ?
+                WHERE id = ?
+                """,
+                changed_rows,
+            )
+            db.executemany(
+                """
+                INSERT INTO invoice_items (
+                    invoice_id, item_id, item_name, quantity, unit, price, vat_amount, line_total
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                new_rows,
+            )
         return redirect(url_for("view_invoice_page", invoice_id=invoice_id))
 
     @app.post("/invoices/delete")
     def delete_invoice():
         db = get_db()
-        ensure_invoices_tables()
 
         invoice_id = request.form.get("invoice_id", "").strip()
         try:
@@ -2077,29 +2207,36 @@ def create_app(test_config=None):
         except ValueError:
             return redirect(url_for("invoices_page"))
 
-        db.execute("DELETE FROM invoice_items WHERE invoice_id = ?", (parsed_invoice_id,))
-        db.execute("DELETE FROM invoices WHERE id = ?", (parsed_invoice_id,))
-        db.commit()
+        with db:
+            db.execute("DELETE FROM invoices WHERE id = ?", (parsed_invoice_id,))
         return redirect(url_for("invoices_page"))
 
     @app.route("/invoices/<int:invoice_id>")
     def view_invoice_page(invoice_id):
         db = get_db()
-        ensure_invoices_tables()
-
-        invoice = db.execute("SELECT * FROM invoices WHERE id = ?", (invoice_id,)).fetchone()
-        if invoice is None:
-            return redirect(url_for("invoices_page"))
 
-        invoice_items = db.execute(
+        cursor = db.execute(
             """
-            SELECT item_name, quantity, unit, price, vat_amount, line_total
-            FROM invoice_items
-            WHERE invoice_id = ?
-            ORDER BY id ASC
+            SELECT
+                d.*,
+                li.item_name,
+                li.quantity,
+                li.unit,
+                li.price,
+                li.vat_amount,
+                li.line_total
+            FROM invoices d
+            LEFT JOIN invoice_items li ON li.invoice_id = d.id
+            WHERE d.id = ?
+            ORDER BY li.id ASC
             """,
             (invoice_id,),
-        ).fetchall()
+        )
+        invoice = cursor.fetchone()
+        if invoice is None:
+            return redirect(url_for("invoices_page"))
+
+        invoice_items = (row for row in chain((invoice,), cursor) if row["item_name"] is not None)
 
         return render_template(
             "invoice_view.html",
@@ -2112,75 +2249,141 @@ def create_app(test_config=None):
     @app.route("/purchases")
     def purchases_page():
         db = get_db()
-        ensure_purchase_invoices_tables()
-        ensure_payment_tables()
         search_query = request.args.get("q", "").strip()
 
-        payment_methods = db.execute(
-            """
-            SELECT id, name, method_type
-            FROM payment_methods
-            ORDER BY name ASC
-            """
-        ).fetchall()
+        try:
+            before_id = int(request.args.get("before_id", "").strip())
+        except ValueError:
+            before_id = None
+
+        page_size = 50
+        payment_methods = _get_payment_method_options(db)
 
-        if search_query:
+        if SEARCH_INDEX_AVAILABLE and len(search_query) >= 3:
+            purchases = db.execute(
+                """
+                SELECT
+                    id,
+                    purchase_number,
+                    purchase_date,
+                    vendor_name,
+                    total,
+                    paid_amount,
+                    CASE
+                        WHEN total - paid_amount > 0 THEN total - paid_amount
+                        ELSE 0
+                    END AS outstanding_amount
+                FROM (
+                    SELECT
+                        p.id,
+                        p.purchase_number,
+                        p.purchase_date,
+                        p.vendor_name,
+                        p.total,
+                        COALESCE((
+                            SELECT SUM(pt.amount)
+                            FROM payment_transactions pt
+                            WHERE pt.reference_type = 'purchase'
+                              AND pt.transaction_type = 'purchase_payment'
+                              AND pt.reference_id = p.id
+                        ), 0) AS paid_amount
+                    FROM purchase_invoices p
+                    WHERE p.id IN (
+                        SELECT rowid FROM purchase_invoices_fts WHERE purchase_invoices_fts MATCH ?
+                    )
+                      AND (? IS NULL OR p.id < ?)
+                    ORDER BY p.id DESC
+                    LIMIT ?
+                )
+                ORDER BY id DESC
+                """,
+                (_fts_phrase(search_query), before_id, before_id, page_size + 1),
+            ).fetchall()
+        elif search_query:
             like_query = f"%{search_query}%"
             purchases = db.execute(
                 """
                 SELECT
-                    p.id,
-                    p.purchase_number,
-                    p.purchase_date,
-                    p.vendor_name,
-                    p.total,
-                    COALESCE(pay.paid_amount, 0) AS paid_amount,
-                    MAX(p.total - COALESCE(pay.paid_amount, 0), 0) AS outstanding_amount
-                FROM purchase_invoices p
-                LEFT JOIN (
-                    SELECT reference_id, SUM(amount) AS paid_amount
-                    FROM payment_transactions
-                    WHERE reference_type = 'purchase'
-                      AND transaction_type = 'purchase_payment'
-                    GROUP BY reference_id
-                ) pay ON pay.reference_id = p.id
-                WHERE p.purchase_number LIKE ?
-                   OR p.purchase_date LIKE ?
-                   OR p.vendor_name LIKE ?
-                ORDER BY p.id DESC
+                    id,
+                    purchase_number,
+                    purchase_date,
+                    vendor_name,
+                    total,
+                    paid_amount,
+                    CASE
+                        WHEN total - paid_amount > 0 THEN total - paid_amount
+                        ELSE 0
+                    END AS outstanding_amount
+                FROM (
+                    SELECT
+                        p.id,
+                        p.purchase_number,
+                        p.purchase_date,
+                        p.vendor_name,
+                        p.total,
+                        COALESCE((
+                            SELECT SUM(pt.amount)
+                            FROM payment_transactions pt
+                            WHERE pt.reference_type = 'purchase'
+                              AND pt.transaction_type = 'purchase_payment'
+                              AND pt.reference_id = p.id
+                        ), 0) AS paid_amount
+                    FROM purchase_invoices p
+                    WHERE (p.purchase_number LIKE ?
+                       OR p.purchase_date LIKE ?
+                       OR p.vendor_name LIKE ?)
+                      AND (? IS NULL OR p.id < ?)
+                    ORDER BY p.id DESC
+                    LIMIT ?
+                )
+                ORDER BY id DESC
                 """,
-                (like_query, like_query, like_query),
+                (like_query, like_query, like_query, before_id, before_id, page_size + 1),
             ).fetchall()
         else:
             purchases = db.execute(
                 """
                 SELECT
-                    p.id,
-                    p.purchase_number,
-                    p.purchase_date,
-                    p.vendor_name,
-                    p.total,
-                    COALESCE(pay.paid_amount, 0) AS paid_amount,
-                    MAX(p.total - COALESCE(pay.paid_amount, 0), 0) AS outstanding_amount
-                FROM purchase_invoices p
-                LEFT JOIN (
-                    SELECT reference_id, SUM(amount) AS paid_amount
-                    FROM payment_transactions
-                    WHERE reference_type = 'purchase'
-                      AND transaction_type = 'purchase_payment'
-                    GROUP BY reference_id
-                ) pay ON pay.reference_id = p.id
-                ORDER BY p.id DESC
-                """
+                    id,
+                    purchase_number,
+                    purchase_date,
+                    vendor_name,
+                    total,
+                    paid_amount,
+                    CASE
+                        WHEN total - paid_amount > 0 THEN total - paid_amount
+                        ELSE 0
+                    END AS outstanding_amount
+                FROM (
+                    SELECT
+                        p.id,
+                        p.purchase_number,
+                        p.purchase_date,
+                        p.vendor_name,
+                        p.total,
+                        COALESCE((
+                            SELECT SUM(pt.amount)
+                            FROM payment_transactions pt
+                            WHERE pt.reference_type = 'purchase'
+                              AND pt.transaction_type = 'purchase_payment'
+                              AND pt.reference_id = p.id
+                        ), 0) AS paid_amount
+                    FROM purchase_invoices p
+                    WHERE (? IS NULL OR p.id < ?)
+                    ORDER BY p.id DESC
+                    LIMIT ?
+                )
+                ORDER BY id DESC
+                """,
+                (before_id, before_id, page_size + 1),
             ).fetchall()
 
-        currencies = db.execute(
-            """
-            SELECT code, name
-            FROM payment_currencies
-            ORDER BY code ASC
-            """
-        ).fetchall()
+        next_before_id = None
+        if len(purchases) > page_size:
+            purchases = purchases[:page_size]
+            next_before_id = purchases[-1]["id"]
+
+        currencies = _get_currency_options(db)
         return render_template(
             "purchases.html",
             page_title="Purcheases",
@@ -2189,13 +2392,13 @@ def create_app(test_config=None):
             payment_methods=payment_methods,
             currencies=currencies,
             search_query=search_query,
+            before_id=before_id,
+            next_before_id=next_before_id,
         )
 
     @app.post("/purchases/pay")
     def pay_purchase():
         db = get_db()
-        ensure_purchase_invoices_tables()
-        ensure_payment_tables()
 
         purchase_id = request.form.get("purchase_id", "").strip()
         payment_method_id = request.form.get("payment_method_id", "").strip()
@@ -2210,28 +2413,28 @@ def create_app(test_config=None):
             return redirect(url_for("purchases_page"))
 
         purchase = db.execute(
-            "SELECT id, purchase_number, total FROM purchase_invoices WHERE id = ?",
-            (parsed_purchase_id,),
-        ).fetchone()
-        if purchase is None:
-            return redirect(url_for("purchases_page"))
-
-        method = db.execute("SELECT id FROM payment_methods WHERE id = ?", (parsed_payment_method_id,)).fetchone()
-        if method is None:
-            return redirect(url_for("purchases_page"))
-
-        paid_raw = db.execute(
             """
-            SELECT COALESCE(SUM(amount), 0) AS total
-            FROM payment_transactions
-            WHERE reference_type = 'purchase'
-              AND transaction_type = 'purchase_payment'
-              AND reference_id = ?
+            SELECT
+                p.id,
+                p.purchase_number,
+                p.total,
+                (
+                    SELECT COALESCE(SUM(amount), 0)
+                    FROM payment_transactions
+                    WHERE reference_type = 'purchase'
+                      AND transaction_type = 'purchase_payment'
+                      AND reference_id = p.id
+                ) AS paid_amount,
+                EXISTS (SELECT 1 FROM payment_methods WHERE id = ?) AS method_exists
+            FROM purchase_invoices p
+            WHERE p.id = ?
             """,
-            (parsed_purchase_id,),
+            (parsed_payment_method_id, parsed_purchase_id),
         ).fetchone()
+        if purchase is None or not purchase["method_exists"]:
+            return redirect(url_for("purchases_page"))
 
-        outstanding = Decimal(str(purchase["total"] or 0)) - Decimal(str(paid_raw["total"] or 0))
+        outstanding = Decimal(str(purchase["total"] or 0)) - Decimal(str(purchase["paid_amount"] or 0))
         if outstanding <= 0:
             return redirect(url_for("purchases_page"))
 
@@ -2242,61 +2445,41 @@ def create_app(test_config=None):
 
         currency_code = request.form.get("currency_code") or _get_default_currency_code(db)
         transaction_notes = notes or f"Purchase payment for {purchase['purchase_number']}"
-        db.execute(
-            """
-            INSERT INTO payment_transactions (
-                transaction_date,
-                transaction_type,
-                reference_type,
-                reference_id,
-                amount,
-                currency_code,
-                method_id,
-                notes
+        with db:
+            db.execute(
+                """
+                INSERT INTO payment_transactions (
+                    transaction_date,
+                    transaction_type,
+                    reference_type,
+                    reference_id,
+                    amount,
+                    currency_code,
+                    method_id,
+                    notes
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    payment_date,
+                    "purchase_payment",
+                    "purchase",
+                    parsed_purchase_id,
+                    float(amount),
+                    currency_code,
+                    parsed_payment_method_id,
+                    transaction_notes,
+                ),
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                payment_date,
-                "purchase_payment",
-                "purchase",
-                parsed_purchase_id,
-                float(amount),
-                currency_code,
-                parsed_payment_method_id,
-                transaction_notes,
-            ),
-        )
-        db.commit()
         return redirect(url_for("purchases_page"))
 
     @app.route("/purchases/new")
     def new_purchase_page():
         db = get_db()
-        ensure_purchase_invoices_tables()
-        vendors = db.execute(
-            """
-            SELECT id, vendor_name, vendor_tax_number, registration_name,
-                   phone_number, address, website, country, address_2
-            FROM vendors
-            ORDER BY id DESC
-            """
-        ).fetchall()
-        items = db.execute(
-            """
-            SELECT id, name, unit, price, vat_amount
-            FROM items
-            ORDER BY id DESC
-            """
-        ).fetchall()
+        vendors = _get_vendor_options(db)
+        items = _get_item_options(db)
 
-        currencies = db.execute(
-            """
-            SELECT code, name
-            FROM payment_currencies
-            ORDER BY code ASC
-            """
-        ).fetchall()
+        currencies = _get_currency_options(db)
         return render_template(
             "purchase_form.html",
             page_title="Add Purchase Invoice",
@@ -2307,30 +2490,35 @@ def create_app(test_config=None):
             vendors=vendors,
             items_catalog=items,
             currencies=currencies,
-            generated_purchase_number=_generate_purchase_number(db),
+            generated_purchase_number=_generate_purchase_number(),
         )
 
     @app.post("/purchases/add")
     def add_purchase():
         db = get_db()
-        ensure_purchase_invoices_tables()
 
         purchase_number = _ensure_unique_purchase_number(db, request.form.get("purchase_number"))
         purchase_date = request.form.get("purchase_date", "").strip()
         vendor_id = request.form.get("vendor_id", "").strip()
 
-        vendor_name = request.form.get("vendor_name", "").strip() or None
-        vendor_tax_number = request.form.get("vendor_tax_number", "").strip() or None
-        registration_name = request.form.get("registration_name", "").strip() or None
-        phone_number = request.form.get("phone_number", "").strip() or None
-        address = request.form.get("address", "").strip() or None
-        website = request.form.get("website", "").strip() or None
-        country = request.form.get("country", "").strip() or None
-        address_2 = request.form.get("address_2", "").strip() or None
+        (
+            vendor_name,
+            vendor_tax_number,
+            registration_name,
+            phone_number,
+            address,
+            website,
+            country,
+            address_2,
+        ) = _optional_form_values(request.form, _VENDOR_FIELDS)
 
         if not purchase_date:
             return redirect(url_for("new_purchase_page"))
 
+        item_rows, subtotal, vat_total = _parse_line_items(request.form)
+        if not item_rows:
+            return redirect(url_for("new_purchase_page"))
+
         parsed_vendor_id = None
         if vendor_id:
             try:
@@ -2338,111 +2526,51 @@ def create_app(test_config=None):
             except ValueError:
                 parsed_vendor_id = None
 
-        db.execute(
-            """
-            INSERT INTO purchase_invoices (
-                purchase_number, purchase_date, vendor_id,
-                vendor_name, vendor_tax_number, registration_name,
-                phone_number, address, website, country, address_2,
-                subtotal, vat_total, total
+        total = subtotal + vat_total
+        with db:
+            cursor = db.execute(
+                """
+                INSERT INTO purchase_invoices (
+                    purchase_number, purchase_date, vendor_id,
+                    vendor_name, vendor_tax_number, registration_name,
+                    phone_number, address, website, country, address_2,
+                    subtotal, vat_total, total
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    purchase_number,
+                    purchase_date,
+                    parsed_vendor_id,
+                    vendor_name,
+                    vendor_tax_number,
+                    registration_name,
+                    phone_number,
+                    address,
+                    website,
+                    country,
+                    address_2,
+                    float(subtotal),
+                    float(vat_total),
+                    float(total),
+                ),
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 0, 0)
-            """,
-            (
-                purchase_number,
-                purchase_date,
-                parsed_vendor_id,
-                vendor_name,
-                vendor_tax_number,
-                registration_name,
-                phone_number,
-                address,
-                website,
-                country,
-                address_2,
-            ),
-        )
-        purchase_id = db.execute("SELECT last_insert_rowid()").fetchone()[0]
-
-        item_ids = request.form.getlist("item_id[]")
-        item_names = request.form.getlist("item_name[]")
-        quantities = request.form.getlist("quantity[]")
-        units = request.form.getlist("unit[]")
-        prices = request.form.getlist("price[]")
-        vat_amounts = request.form.getlist("vat_amount[]")
-
-        subtotal = Decimal("0")
-        vat_total = Decimal("0")
-
-        max_len = max(
-            len(item_ids),
-            len(item_names),
-            len(quantities),
-            len(units),
-            len(prices),
-            len(vat_amounts),
-            0,
-        )
-
-        for index in range(max_len):
-            raw_name = item_names[index].strip() if index < len(item_names) else ""
-            raw_quantity = quantities[index] if index < len(quantities) else ""
-            raw_unit = units[index].strip() if index < len(units) else ""
-            raw_price = prices[index] if index < len(prices) else ""
-            raw_vat = vat_amounts[index] if index < len(vat_amounts) else ""
-            raw_item_id = item_ids[index].strip() if index < len(item_ids) else ""
+            purchase_id = cursor.lastrowid
 
-            if not raw_name:
-                continue
-
-            quantity = _to_decimal_or_default(raw_quantity, "1")
-            price = _to_decimal_or_default(raw_price, "0")
-            vat_percentage = _to_decimal_or_default(raw_vat, "0")
-            line_net = quantity * price
-            vat_value = (line_net * vat_percentage) / Decimal("100")
-            line_total = line_net + vat_value
-
-            parsed_item_id = None
-            if raw_item_id:
-                try:
-                    parsed_item_id = int(raw_item_id)
-                except ValueError:
-                    parsed_item_id = None
-
-            db.execute(
+            db.executemany(
                 """
                 INSERT INTO purchase_invoice_items (
                     purchase_invoice_id, item_id, item_name, quantity, unit, price, vat_amount, line_total
                 )
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 """,
-                (
-                    purchase_id,
-                    parsed_item_id,
-                    raw_name,
-                    float(quantity),
-                    raw_unit or "1",
-                    float(price),
-                    float(vat_percentage),
-                    float(line_total),
-                ),
+                [(purchase_id,) + row for row in item_rows],
             )
-
-            subtotal += line_net
-            vat_total += vat_value
-
-        total = subtotal + vat_total
-        db.execute(
-            "UPDATE purchase_invoices SET subtotal = ?, vat_total = ?, total = ? WHERE id = ?",
-            (float(subtotal), float(vat_total), float(total), purchase_id),
-        )
-        db.commit()
         return redirect(url_for("view_purchase_page", purchase_id=purchase_id))
 
     @app.route("/purchases/<int:purchase_id>/edit")
     def edit_purchase_page(purchase_id):
         db = get_db()
-        ensure_purchase_invoices_tables()
 
         purchase = db.execute(
             "SELECT * FROM purchase_invoices WHERE id = ?",
@@ -2461,29 +2589,10 @@ def create_app(test_config=None):
             (purchase_id,),
         ).fetchall()
 
-        vendors = db.execute(
-            """
-            SELECT id, vendor_name, vendor_tax_number, registration_name,
-                   phone_number, address, website, country, address_2
-            FROM vendors
-            ORDER BY id DESC
-            """
-        ).fetchall()
-        items = db.execute(
-            """
-            SELECT id, name, unit, price, vat_amount
-            FROM items
-            ORDER BY id DESC
-            """
-        ).fetchall()
+        vendors = _get_vendor_options(db)
+        items = _get_item_options(db)
 
-        currencies = db.execute(
-            """
-            SELECT code, name
-            FROM payment_currencies
-            ORDER BY code ASC
-            """
-        ).fetchall()
+        currencies = _get_currency_options(db)
         return render_template(
             "purchase_form.html",
             page_title="Edit Purchase Invoice",
@@ -2500,7 +2609,6 @@ def create_app(test_config=None):
     @app.post("/purchases/<int:purchase_id>/edit")
     def update_purchase(purchase_id):
         db = get_db()
-        ensure_purchase_invoices_tables()
 
         purchase = db.execute("SELECT id FROM purchase_invoices WHERE id = ?", (purchase_id,)).fetchone()
         if purchase is None:
@@ -2515,6 +2623,10 @@ def create_app(test_config=None):
         if not purchase_date:
             return redirect(url_for("edit_purchase_page", purchase_id=purchase_id))
 
+        item_rows, subtotal, vat_total = _parse_line_items(request.form)
+        if not item_rows:
+            return redirect(url_for("edit_purchase_page", purchase_id=purchase_id))
+
         vendor_id = request.form.get("vendor_id", "").strip()
         parsed_vendor_id = None
         if vendor_id:
@@ -2523,120 +2635,87 @@ def create_app(test_config=None):
             except ValueError:
                 parsed_vendor_id = None
 
-        vendor_name = request.form.get("vendor_name", "").strip() or None
-        vendor_tax_number = request.form.get("vendor_tax_number", "").strip() or None
-        registration_name = request.form.get("registration_name", "").strip() or None
-        phone_number = request.form.get("phone_number", "").strip() or None
-        address = request.form.get("address", "").strip() or None
-        website = request.form.get("website", "").strip() or None
-        country = request.form.get("country", "").strip() or None
-        address_2 = request.form.get("address_2", "").strip() or None
+        (
+            vendor_name,
+            vendor_tax_number,
+            registration_name,
+            phone_number,
+            address,
+            website,
+            country,
+            address_2,
+        ) = _optional_form_values(request.form, _VENDOR_FIELDS)
 
-        db.execute(
+        total = subtotal + vat_total
+        existing_lines = db.execute(
             """
-            UPDATE purchase_invoices
-            SET purchase_number = ?, purchase_date = ?, vendor_id = ?,
-                vendor_name = ?, vendor_tax_number = ?, registration_name = ?,
-                phone_number = ?, address = ?, website = ?, country = ?, address_2 = ?
-            WHERE id = ?
+            SELECT id, item_id, item_name, quantity, unit, price, vat_amount, line_total
+            FROM purchase_invoice_items
+            WHERE purchase_invoice_id = ?
+            ORDER BY id ASC
             """,
-            (
-                purchase_number,
-                purchase_date,
-                parsed_vendor_id,
-                vendor_name,
-                vendor_tax_number,
-                registration_name,
-                phone_number,
-                address,
-                website,
-                country,
-                address_2,
-                purchase_id,
-            ),
-        )
-
-        db.execute("DELETE FROM purchase_invoice_items WHERE purchase_invoice_id = ?", (purchase_id,))
-
-        item_ids = request.form.getlist("item_id[]")
-        item_names = request.form.getlist("item_name[]")
-        quantities = request.form.getlist("quantity[]")
-        units = request.form.getlist("unit[]")
-        prices = request.form.getlist("price[]")
-        vat_amounts = request.form.getlist("vat_amount[]")
-
-        subtotal = Decimal("0")
-        vat_total = Decimal("0")
-
-        max_len = max(
-            len(item_ids),
-            len(item_names),
-            len(quantities),
-            len(units),
-            len(prices),
-            len(vat_amounts),
-            0,
-        )
-
-        for index in range(max_len):
-            raw_name = item_names[index].strip() if index < len(item_names) else ""
-            raw_quantity = quantities[index] if index < len(quantities) else ""
-            raw_unit = units[index].strip() if index < len(units) else ""
-            raw_price = prices[index] if index < len(prices) else ""
-            raw_vat = vat_amounts[index] if index < len(vat_amounts) else ""
-            raw_item_id = item_ids[index].strip() if index < len(item_ids) else ""
-
-            if not raw_name:
-                continue
-
-            quantity = _to_decimal_or_default(raw_quantity, "1")
-            price = _to_decimal_or_default(raw_price, "0")
-            vat_percentage = _to_decimal_or_default(raw_vat, "0")
-            line_net = quantity * price
-            vat_value = (line_net * vat_percentage) / Decimal("100")
-            line_total = line_net + vat_value
-
-            parsed_item_id = None
-            if raw_item_id:
-                try:
-                    parsed_item_id = int(raw_item_id)
-                except ValueError:
-                    parsed_item_id = None
+            (purchase_id,),
+        ).fetchall()
+        changed_rows = [
+            row + (line["id"],)
+            for line, row in zip(existing_lines, item_rows)
+            if tuple(line)[1:] != row
+        ]
+        new_rows = [(purchase_id,) + row for row in item_rows[len(existing_lines):]]
+        stale_ids = [(line["id"],) for line in existing_lines[len(item_rows):]]
 
+        with db:
             db.execute(
                 """
-                INSERT INTO purchase_invoice_items (
-                    purchase_invoice_id, item_id, item_name, quantity, unit, price, vat_amount, line_total
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                UPDATE purchase_invoices
+                SET purchase_number = ?, purchase_date = ?, vendor_id = ?,
+                    vendor_name = ?, vendor_tax_number = ?, registration_name = ?,
+                    phone_number = ?, address = ?, website = ?, country = ?, address_2 = ?,
+                    subtotal = ?, vat_total = ?, total = ?
+                WHERE id = ?
                 """,
                 (
+                    purchase_number,
+                    purchase_date,
+                    parsed_vendor_id,
+                    vendor_name,
+                    vendor_tax_number,
+                    registration_name,
+                    phone_number,
+                    address,
+                    website,
+                    country,
+                    address_2,
+                    float(subtotal),
+                    float(vat_total),
+                    float(total),
                     purchase_id,
-                    parsed_item_id,
-                    raw_name,
-                    float(quantity),
-                    raw_unit or "1",
-                    float(price),
-                    float(vat_percentage),
-                    float(line_total),
                 ),
             )
 
-            subtotal += line_net
-            vat_total += vat_value
-
-        total = subtotal + vat_total
-        db.execute(
-            "UPDATE purchase_invoices SET subtotal = ?, vat_total = ?, total = ? WHERE id = ?",
-            (float(subtotal), float(vat_total), float(total), purchase_id),
-        )
-        db.commit()
+            db.executemany("DELETE FROM purchase_invoice_items WHERE id = ?", stale_ids)
+            db.executemany(
+                """
+                UPDATE purchase_invoice_items
+                SET item_id = ?, item_name = ?, quantity = ?, unit = ?, price = ?, vat_amount = ?, line_total = ?
+                WHERE id = ?
+                """,
+                changed_rows,
+            )
+            db.executemany(
+                """
+                INSERT INTO purchase_invoice_items (
+                    purchase_invoice_id, item_id, item_name, quantity, unit, price, vat_amount, line_total
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                new_rows,
+            )
         return redirect(url_for("view_purchase_page", purchase_id=purchase_id))
 
     @app.post("/purchases/delete")
     def delete_purchase():
         db = get_db()
-        ensure_purchase_invoices_tables()
 
         purchase_id = request.form.get("purchase_id", "").strip()
         try:
@@ -2644,29 +2723,36 @@ def create_app(test_config=None):
         except ValueError:
             return redirect(url_for("purchases_page"))
 
-        db.execute("DELETE FROM purchase_invoice_items WHERE purchase_invoice_id = ?", (parsed_purchase_id,))
-        db.execute("DELETE FROM purchase_invoices WHERE id = ?", (parsed_purchase_id,))
-        db.commit()
+        with db:
+            db.execute("DELETE FROM purchase_invoices WHERE id = ?", (parsed_purchase_id,))
         return redirect(url_for("purchases_page"))
 
     @app.route("/purchases/<int:purchase_id>")
     def view_purchase_page(purchase_id):
         db = get_db()
-        ensure_purchase_invoices_tables()
-
-        purchase = db.execute("SELECT * FROM purchase_invoices WHERE id = ?", (purchase_id,)).fetchone()
-        if purchase is None:
-            return redirect(url_for("purchases_page"))
 
-        purchase_items = db.execute(
+        cursor = db.execute(
             """
-            SELECT item_name, quantity, unit, price, vat_amount, line_total
-            FROM purchase_invoice_items
-            WHERE purchase_invoice_id = ?
-            ORDER BY id ASC
+            SELECT
+                d.*,
+                li.item_name,
+                li.quantity,
+                li.unit,
+                li.price,
+                li.vat_amount,
+                li.line_total
+            FROM purchase_invoices d
+            LEFT JOIN purchase_invoice_items li ON li.purchase_invoice_id = d.id
+            WHERE d.id = ?
+            ORDER BY li.id ASC
             """,
             (purchase_id,),
-        ).fetchall()
+        )
+        purchase = cursor.fetchone()
+        if purchase is None:
+            return redirect(url_for("purchases_page"))
+
+        purchase_items = (row for row in chain((purchase,), cursor) if row["item_name"] is not None)
 
         return render_template(
             "purchase_view.html",
@@ -2679,117 +2765,103 @@ def create_app(test_config=None):
     @app.route("/assets")
     def assets_page():
         db = get_db()
-        ensure_purchase_invoices_tables()
-        ensure_invoices_tables()
-
-        purchase_rows = db.execute(
-            """
-            SELECT
-                pii.item_id,
-                pii.item_name,
-                pii.quantity,
-                pii.unit,
-                pii.price,
-                pi.purchase_date
-            FROM purchase_invoice_items pii
-            JOIN purchase_invoices pi ON pi.id = pii.purchase_invoice_id
-            ORDER BY pi.purchase_date ASC, pii.id ASC
-            """
-        ).fetchall()
 
-        invoice_rows = db.execute(
+        asset_rows = db.execute(
             """
             SELECT
-                ii.item_id,
-                ii.item_name,
-                ii.quantity,
-                ii.unit,
-                ii.price,
-                i.invoice_date
-            FROM invoice_items ii
-            JOIN invoices i ON i.id = ii.invoice_id
-            ORDER BY i.invoice_date ASC, ii.id ASC
+                COALESCE(NULLIF(MAX(display_name), ''), 'Unnamed Item') AS item_name,
+                COALESCE(NULLIF(MAX(display_unit), ''), '1') AS unit,
+                TOTAL(CASE WHEN src = 'p' THEN quantity END) AS purchased_qty,
+                TOTAL(CASE WHEN src = 's' THEN quantity END) AS sold_qty,
+                TOTAL(CASE WHEN src = 'p' THEN quantity * price END) AS purchase_value,
+                MAX(CASE WHEN src = 'p' THEN document_date END) AS last_purchase_date,
+                MAX(CASE WHEN src = 's' THEN document_date END) AS last_sale_date
+            FROM (
+                SELECT
+                    group_key,
+                    src,
+                    quantity,
+                    price,
+                    document_date,
+                    FIRST_VALUE(item_name) OVER (
+                        PARTITION BY group_key
+                        ORDER BY COALESCE(item_name, '') = '', src DESC, document_date DESC, line_id DESC
+                    ) AS display_name,
+                    FIRST_VALUE(unit) OVER (
+                        PARTITION BY group_key
+                        ORDER BY COALESCE(unit, '') = '', src DESC, document_date DESC, line_id DESC
+                    ) AS display_unit
+                FROM (
+                    SELECT
+                        CASE
+                            WHEN pii.item_id IS NOT NULL THEN 'id:' || pii.item_id
+                            ELSE 'name:' || normalized_name(pii.item_name)
+                        END AS group_key,
+                        'p' AS src,
+                        pii.id AS line_id,
+                        pii.item_name,
+                        pii.unit,
+                        pii.quantity,
+                        pii.price,
+                        pi.purchase_date AS document_date
+                    FROM purchase_invoice_items pii
+                    JOIN purchase_invoices pi ON pi.id = pii.purchase_invoice_id
+                    UNION ALL
+                    SELECT
+                        CASE
+                            WHEN ii.item_id IS NOT NULL THEN 'id:' || ii.item_id
+                            ELSE 'name:' || normalized_name(ii.item_name)
+                        END AS group_key,
+                        's' AS src,
+                        ii.id AS line_id,
+                        ii.item_name,
+                        ii.unit,
+                        ii.quantity,
+                        ii.price,
+                        i.invoice_date AS document_date
+                    FROM invoice_items ii
+                    JOIN invoices i ON i.id = ii.invoice_id
+                )
+            )
+            GROUP BY group_key
             """
         ).fetchall()
 
-        assets = {}
-
-        for row in purchase_rows:
-            key = _asset_key(row["item_id"], row["item_name"])
-            if key not in assets:
-                assets[key] = {
-                    "item_name": row["item_name"] or "Unnamed Item",
-                    "unit": row["unit"] or "1",
-                    "purchased_qty": Decimal("0"),
-                    "sold_qty": Decimal("0"),
-                    "purchase_value": Decimal("0"),
-                    "last_purchase_date": None,
-                    "last_sale_date": None,
-                }
-
-            quantity = _to_decimal_or_default(str(row["quantity"]), "0")
-            price = _to_decimal_or_default(str(row["price"]), "0")
-
-            assets[key]["purchased_qty"] += quantity
-            assets[key]["purchase_value"] += quantity * price
-            assets[key]["unit"] = row["unit"] or assets[key]["unit"]
-            assets[key]["item_name"] = row["item_name"] or assets[key]["item_name"]
-            assets[key]["last_purchase_date"] = row["purchase_date"]
-
-        for row in invoice_rows:
-            key = _asset_key(row["item_id"], row["item_name"])
-            if key not in assets:
-                assets[key] = {
-                    "item_name": row["item_name"] or "Unnamed Item",
-                    "unit": row["unit"] or "1",
-                    "purchased_qty": Decimal("0"),
-                    "sold_qty": Decimal("0"),
-                    "purchase_value": Decimal("0"),
-                    "last_purchase_date": None,
-                    "last_sale_date": None,
-                }
-
-            quantity = _to_decimal_or_default(str(row["quantity"]), "0")
-            assets[key]["sold_qty"] += quantity
-            assets[key]["unit"] = row["unit"] or assets[key]["unit"]
-            assets[key]["item_name"] = row["item_name"] or assets[key]["item_name"]
-            assets[key]["last_sale_date"] = row["invoice_date"]
-
         rows = []
-        total_stock_value = Decimal("0")
-        total_available_qty = Decimal("0")
+        total_stock_value = 0.0
+        total_available_qty = 0.0
 
         search_query = request.args.get("q", "").strip().lower()
 
-        for data in assets.values():
+        for data in asset_rows:
+            name_key = data["item_name"].lower()
+            if search_query and search_query not in name_key:
+                continue
+
             purchased_qty = data["purchased_qty"]
             sold_qty = data["sold_qty"]
             available_qty = purchased_qty - sold_qty
-            average_cost = (
-                (data["purchase_value"] / purchased_qty) if purchased_qty > 0 else Decimal("0")
-            )
+            average_cost = (data["purchase_value"] / purchased_qty) if purchased_qty > 0 else 0.0
             stock_value = available_qty * average_cost
 
-            row_payload = {
-                "item_name": data["item_name"],
-                "unit": data["unit"],
-                "purchased_qty": float(purchased_qty),
-                "sold_qty": float(sold_qty),
-                "available_qty": float(available_qty),
-                "average_cost": float(average_cost),
-                "stock_value": float(stock_value),
-                "last_purchase_date": data["last_purchase_date"],
-                "last_sale_date": data["last_sale_date"],
-            }
-
-            if search_query and search_query not in row_payload["item_name"].lower():
-                continue
-
-            rows.append(row_payload)
+            rows.append(
+                {
+                    "item_name": data["item_name"],
+                    "unit": data["unit"],
+                    "purchased_qty": purchased_qty,
+                    "sold_qty": sold_qty,
+                    "available_qty": available_qty,
+                    "average_cost": average_cost,
+                    "stock_value": stock_value,
+                    "last_purchase_date": data["last_purchase_date"],
+                    "last_sale_date": data["last_sale_date"],
+                    "name_key": name_key,
+                }
+            )
             total_stock_value += stock_value
             total_available_qty += available_qty
 
-        rows.sort(key=lambda entry: entry["item_name"].lower())
+        rows.sort(key=itemgetter("name_key"))
 
         return render_template(
             "assets.html",
@@ -2797,27 +2869,18 @@ def create_app(test_config=None):
             active_menu="Assets",
             assets=rows,
             search_query=request.args.get("q", "").strip(),
-            total_stock_value=float(total_stock_value),
-            total_available_qty=float(total_available_qty),
+            total_stock_value=total_stock_value,
+            total_available_qty=total_available_qty,
         )
 
     @app.route("/expenses")
     def expenses_page():
         db = get_db()
-        ensure_expenses_table()
-        ensure_payment_tables()
 
-        payment_methods = db.execute(
-            """
-            SELECT id, name, method_type
-            FROM payment_methods
-            ORDER BY name ASC
-            """
-        ).fetchall()
+        payment_methods = _get_payment_method_options(db)
 
         search_query = request.args.get("q", "").strip()
-        if search_query:
-            like_query = f"%{search_query}%"
+        if SEARCH_INDEX_AVAILABLE and len(search_query) >= 3:
             expenses = db.execute(
                 """
                 SELECT
@@ -2833,15 +2896,36 @@ def create_app(test_config=None):
                     m.method_type AS payment_method_type
                 FROM expenses e
                 LEFT JOIN payment_methods m ON m.id = e.payment_method_id
-                WHERE expense_number LIKE ?
-                   OR expense_date LIKE ?
-                   OR title LIKE ?
-                   OR category LIKE ?
+                WHERE e.id IN (SELECT rowid FROM expenses_fts WHERE expenses_fts MATCH ?)
                    OR m.name LIKE ?
-                   OR notes LIKE ?
                 ORDER BY e.id DESC
                 """,
-                (like_query, like_query, like_query, like_query, like_query, like_query),
+                (_fts_phrase(search_query), f"%{search_query}%"),
+            ).fetchall()
+        elif search_query:
+            expenses = db.execute(
+                """
+                SELECT
+                    e.id,
+                    e.expense_number,
+                    e.expense_date,
+                    e.title,
+                    e.category,
+                    e.payment_method_id,
+                    e.amount,
+                    e.notes,
+                    m.name AS payment_method_name,
+                    m.method_type AS payment_method_type
+                FROM expenses e
+                LEFT JOIN payment_methods m ON m.id = e.payment_method_id
+                WHERE (
+                    e.expense_number || char(31) || e.expense_date || char(31) || e.title || char(31)
+                    || COALESCE(e.category, '') || char(31) || COALESCE(m.name, '') || char(31)
+                    || COALESCE(e.notes, '')
+                ) LIKE ? ESCAPE '\\'
+                ORDER BY e.id DESC
+                """,
+                (_like_pattern(search_query),),
             ).fetchall()
         else:
             expenses = db.execute(
@@ -2863,13 +2947,7 @@ def create_app(test_config=None):
                 """
             ).fetchall()
 
-        currencies = db.execute(
-            """
-            SELECT code, name
-            FROM payment_currencies
-            ORDER BY code ASC
-            """
-        ).fetchall()
+        currencies = _get_currency_options(db)
         return render_template(
             "expenses.html",
             page_title="Expenses",
@@ -2883,8 +2961,6 @@ def create_app(test_config=None):
     @app.post("/expenses/add")
     def add_expense():
         db = get_db()
-        ensure_expenses_table()
-        ensure_payment_tables()
 
         expense_date = request.form.get("expense_date", "").strip()
         title = request.form.get("title", "").strip()
@@ -2908,59 +2984,57 @@ def create_app(test_config=None):
         if payment_method_exists is None:
             return redirect(url_for("expenses_page"))
 
-        expense_number = _generate_expense_number(db)
-        insert_result = db.execute(
-            """
-            INSERT INTO expenses (expense_number, expense_date, title, category, payment_method_id, amount, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                expense_number,
-                expense_date,
-                title,
-                category,
-                parsed_payment_method_id,
-                float(amount),
-                notes,
-            ),
-        )
-
-        expense_id = insert_result.lastrowid
+        expense_number = _generate_expense_number()
         currency_code = request.form.get("currency_code", "").strip().upper() or _get_default_currency_code(db)
         transaction_notes = notes or f"Expense payment for {title}"
-        db.execute(
-            """
-            INSERT INTO payment_transactions (
-                transaction_date,
-                transaction_type,
-                reference_type,
-                reference_id,
-                amount,
-                currency_code,
-                method_id,
-                notes
+        with db:
+            insert_result = db.execute(
+                """
+                INSERT INTO expenses (expense_number, expense_date, title, category, payment_method_id, amount, notes)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    expense_number,
+                    expense_date,
+                    title,
+                    category,
+                    parsed_payment_method_id,
+                    float(amount),
+                    notes,
+                ),
+            )
+
+            expense_id = insert_result.lastrowid
+            db.execute(
+                """
+                INSERT INTO payment_transactions (
+                    transaction_date,
+                    transaction_type,
+                    reference_type,
+                    reference_id,
+                    amount,
+                    currency_code,
+                    method_id,
+                    notes
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    expense_date,
+                    "expense_payment",
+                    "expense",
+                    expense_id,
+                    float(amount),
+                    currency_code,
+                    parsed_payment_method_id,
+                    transaction_notes,
+                ),
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                expense_date,
-                "expense_payment",
-                "expense",
-                expense_id,
-                float(amount),
-                currency_code,
-                parsed_payment_method_id,
-                transaction_notes,
-            ),
-        )
-        db.commit()
         return redirect(url_for("expenses_page"))
 
     @app.post("/expenses/edit")
     def edit_expense():
         db = get_db()
-        ensure_expenses_table()
-        ensure_payment_tables()
 
         expense_id = request.form.get("expense_id", "").strip()
         expense_date = request.form.get("expense_date", "").strip()
@@ -2990,76 +3064,74 @@ def create_app(test_config=None):
         if payment_method_exists is None:
             return redirect(url_for("expenses_page"))
 
-        db.execute(
-            """
-            UPDATE expenses
-            SET expense_date = ?, title = ?, category = ?, payment_method_id = ?, amount = ?, notes = ?
-            WHERE id = ?
-            """,
-            (
-                expense_date,
-                title,
-                category,
-                parsed_payment_method_id,
-                float(amount),
-                notes,
-                parsed_expense_id,
-            ),
-        )
-
         transaction_notes = notes or f"Expense payment for {title}"
-        updated_transaction = db.execute(
-            """
-            UPDATE payment_transactions
-            SET transaction_date = ?, amount = ?, method_id = ?, notes = ?
-            WHERE reference_type = 'expense'
-              AND reference_id = ?
-              AND transaction_type = 'expense_payment'
-            """,
-            (
-                expense_date,
-                float(amount),
-                parsed_payment_method_id,
-                transaction_notes,
-                parsed_expense_id,
-            ),
-        )
-
-        if updated_transaction.rowcount == 0:
-            currency_code = request.form.get("currency_code") or _get_default_currency_code(db)
+        with db:
             db.execute(
                 """
-                INSERT INTO payment_transactions (
-                    transaction_date,
-                    transaction_type,
-                    reference_type,
-                    reference_id,
-                    amount,
-                    currency_code,
-                    method_id,
-                    notes
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                UPDATE expenses
+                SET expense_date = ?, title = ?, category = ?, payment_method_id = ?, amount = ?, notes = ?
+                WHERE id = ?
                 """,
                 (
                     expense_date,
-                    "expense_payment",
-                    "expense",
+                    title,
+                    category,
+                    parsed_payment_method_id,
+                    float(amount),
+                    notes,
                     parsed_expense_id,
+                ),
+            )
+
+            updated_transaction = db.execute(
+                """
+                UPDATE payment_transactions
+                SET transaction_date = ?, amount = ?, method_id = ?, notes = ?
+                WHERE reference_type = 'expense'
+                  AND reference_id = ?
+                  AND transaction_type = 'expense_payment'
+                """,
+                (
+                    expense_date,
                     float(amount),
-                    currency_code,
                     parsed_payment_method_id,
                     transaction_notes,
+                    parsed_expense_id,
                 ),
             )
-        db.commit()
+
+            if updated_transaction.rowcount == 0:
+                currency_code = request.form.get("currency_code") or _get_default_currency_code(db)
+                db.execute(
+                    """
+                    INSERT INTO payment_transactions (
+                        transaction_date,
+                        transaction_type,
+                        reference_type,
+                        reference_id,
+                        amount,
+                        currency_code,
+                        method_id,
+                        notes
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        expense_date,
+                        "expense_payment",
+                        "expense",
+                        parsed_expense_id,
+                        float(amount),
+                        currency_code,
+                        parsed_payment_method_id,
+                        transaction_notes,
+                    ),
+                )
         return redirect(url_for("expenses_page"))
 
     @app.post("/expenses/delete")
     def delete_expense():
         db = get_db()
-        ensure_expenses_table()
-        ensure_payment_tables()
 
         expense_id = request.form.get("expense_id", "").strip()
         try:
@@ -3067,23 +3139,22 @@ def create_app(test_config=None):
         except ValueError:
             return redirect(url_for("expenses_page"))
 
-        db.execute(
-            """
-            DELETE FROM payment_transactions
-            WHERE reference_type = 'expense'
-              AND reference_id = ?
-              AND transaction_type = 'expense_payment'
-            """,
-            (parsed_expense_id,),
-        )
-        db.execute("DELETE FROM expenses WHERE id = ?", (parsed_expense_id,))
-        db.commit()
+        with db:
+            db.execute(
+                """
+                DELETE FROM payment_transactions
+                WHERE reference_type = 'expense'
+                  AND reference_id = ?
+                  AND transaction_type = 'expense_payment'
+                """,
+                (parsed_expense_id,),
+            )
+            db.execute("DELETE FROM expenses WHERE id = ?", (parsed_expense_id,))
         return redirect(url_for("expenses_page"))
 
     @app.route("/payments")
     def payments_page():
         db = get_db()
-        ensure_payment_tables()
 
         methods = db.execute(
             """
@@ -3150,7 +3221,6 @@ def create_app(test_config=None):
     @app.post("/payments/methods/add")
     def add_payment_method():
         db = get_db()
-        ensure_payment_tables()
 
         name = request.form.get("name", "").strip()
         method_type = request.form.get("method_type", "").strip()
@@ -3173,7 +3243,6 @@ def create_app(test_config=None):
     @app.post("/payments/methods/edit")
     def edit_payment_method():
         db = get_db()
-        ensure_payment_tables()
 
         method_id = request.form.get("method_id", "").strip()
         name = request.form.get("name", "").strip()
@@ -3203,7 +3272,6 @@ def create_app(test_config=None):
     @app.post("/payments/methods/delete")
     def delete_payment_method():
         db = get_db()
-        ensure_payment_tables()
 
         method_id = request.form.get("method_id", "").strip()
         try:
@@ -3218,7 +3286,6 @@ def create_app(test_config=None):
     @app.post("/payments/currencies/add")
     def add_payment_currency():
         db = get_db()
-        ensure_payment_tables()
 
         code = request.form.get("code", "").strip().upper()
         name = request.form.get("name", "").strip()
@@ -3241,7 +3308,6 @@ def create_app(test_config=None):
     @app.post("/payments/currencies/edit")
     def edit_payment_currency():
         db = get_db()
-        ensure_payment_tables()
 
         currency_id = request.form.get("currency_id", "").strip()
         code = request.form.get("code", "").strip().upper()
@@ -3271,7 +3337,6 @@ def create_app(test_config=None):
     @app.post("/payments/currencies/delete")
     def delete_payment_currency():
         db = get_db()
-        ensure_payment_tables()
 
         currency_id = request.form.get("currency_id", "").strip()
         try:
@@ -3286,7 +3351,6 @@ def create_app(test_config=None):
     @app.post("/payments/transactions/add")
     def add_payment_transaction():
         db = get_db()
-        ensure_payment_tables()
 
         transaction_date = request.form.get("transaction_date", "").strip()
         transaction_type = request.form.get("transaction_type", "").strip()
@@ -3345,7 +3409,6 @@ def create_app(test_config=None):
     @app.post("/payments/transactions/delete")
     def delete_payment_transaction():
         db = get_db()
-        ensure_payment_tables()
 
         transaction_id = request.form.get("transaction_id", "").strip()
         try:
@@ -3360,102 +3423,97 @@ def create_app(test_config=None):
     @app.route("/report")
     def report_page():
         db = get_db()
-        ensure_invoices_tables()
-        ensure_purchase_invoices_tables()
-        ensure_expenses_table()
-        ensure_payment_tables()
-
-        sold_total_raw = db.execute("SELECT COALESCE(SUM(total), 0) AS total FROM invoices").fetchone()
-        bought_total_raw = db.execute(
-            "SELECT COALESCE(SUM(total), 0) AS total FROM purchase_invoices"
-        ).fetchone()
-        expenses_total_raw = db.execute(
-            "SELECT COALESCE(SUM(amount), 0) AS total FROM expenses"
-        ).fetchone()
-
-        sold_total = Decimal(str(sold_total_raw["total"] or 0))
-        bought_total = Decimal(str(bought_total_raw["total"] or 0))
-        expenses_total = Decimal(str(expenses_total_raw["total"] or 0))
 
-        net_result = sold_total - bought_total - expenses_total
-        benefit = net_result if net_result > 0 else Decimal("0")
-        loss = -net_result if net_result < 0 else Decimal("0")
-
-        invoice_outstanding_raw = db.execute(
+        totals_raw = db.execute(
             """
-            SELECT COALESCE(SUM(i.total), 0) - COALESCE(SUM(r.received_amount), 0) AS outstanding
-            FROM invoices i
-            LEFT JOIN (
-                SELECT reference_id, SUM(amount) AS received_amount
-                FROM payment_transactions
-                WHERE reference_type = 'invoice'
-                  AND transaction_type = 'invoice_receipt'
-                GROUP BY reference_id
-            ) r ON r.reference_id = i.id
+            SELECT
+                (SELECT COALESCE(SUM(total), 0) FROM invoices) AS sold_total,
+                (SELECT COALESCE(SUM(total), 0) FROM purchase_invoices) AS bought_total,
+                (SELECT COALESCE(SUM(amount), 0) FROM expenses) AS expenses_total,
+                (
+                    SELECT COALESCE(SUM(i.total), 0) - COALESCE(SUM(r.received_amount), 0)
+                    FROM invoices i
+                    LEFT JOIN (
+                        SELECT reference_id, SUM(amount) AS received_amount
+                        FROM payment_transactions
+                        WHERE reference_type = 'invoice'
+                          AND transaction_type = 'invoice_receipt'
+                        GROUP BY reference_id
+                    ) r ON r.reference_id = i.id
+                ) AS invoice_outstanding,
+                (
+                    SELECT COALESCE(SUM(p.total), 0) - COALESCE(SUM(pay.paid_amount), 0)
+                    FROM purchase_invoices p
+                    LEFT JOIN (
+                        SELECT reference_id, SUM(amount) AS paid_amount
+                        FROM payment_transactions
+                        WHERE reference_type = 'purchase'
+                          AND transaction_type = 'purchase_payment'
+                        GROUP BY reference_id
+                    ) pay ON pay.reference_id = p.id
+                ) AS purchase_outstanding
             """
         ).fetchone()
 
-        purchase_outstanding_raw = db.execute(
-            """
-            SELECT COALESCE(SUM(p.total), 0) - COALESCE(SUM(pay.paid_amount), 0) AS outstanding
-            FROM purchase_invoices p
-            LEFT JOIN (
-                SELECT reference_id, SUM(amount) AS paid_amount
-                FROM payment_transactions
-                WHERE reference_type = 'purchase'
-                  AND transaction_type = 'purchase_payment'
-                GROUP BY reference_id
-            ) pay ON pay.reference_id = p.id
-            """
-        ).fetchone()
+        sold_total = float(totals_raw["sold_total"] or 0)
+        bought_total = float(totals_raw["bought_total"] or 0)
+        expenses_total = float(totals_raw["expenses_total"] or 0)
 
-        should_receive = Decimal(str(invoice_outstanding_raw["outstanding"] or 0))
-        i_owe = Decimal(str(purchase_outstanding_raw["outstanding"] or 0))
-        debt = i_owe
+        net_result = sold_total - bought_total - expenses_total
+        benefit = net_result if net_result > 0 else 0.0
+        loss = -net_result if net_result < 0 else 0.0
 
-        invoice_vat_rows = db.execute(
-            """
-            SELECT
-                i.id,
-                i.invoice_number,
-                i.invoice_date,
-                i.customer_name,
-                COALESCE(i.total, 0) AS total,
-                COALESCE(i.vat_total, 0) AS vat_total,
-                COALESCE(r.received_amount, 0) AS received_amount
-            FROM invoices i
-            LEFT JOIN (
-                SELECT reference_id, SUM(amount) AS received_amount
-                FROM payment_transactions
-                WHERE reference_type = 'invoice'
-                  AND transaction_type = 'invoice_receipt'
-                GROUP BY reference_id
-            ) r ON r.reference_id = i.id
-            """
-        ).fetchall()
+        should_receive = float(totals_raw["invoice_outstanding"] or 0)
+        i_owe = float(totals_raw["purchase_outstanding"] or 0)
+        debt = i_owe
 
-        purchase_vat_rows = db.execute(
+        vat_rows = db.execute(
             """
-            SELECT
-                p.id,
-                p.purchase_number,
-                p.purchase_date,
-                p.vendor_name,
-                COALESCE(p.total, 0) AS total,
-                COALESCE(p.vat_total, 0) AS vat_total,
-                COALESCE(pay.paid_amount, 0) AS paid_amount
-            FROM purchase_invoices p
-            LEFT JOIN (
-                SELECT reference_id, SUM(amount) AS paid_amount
-                FROM payment_transactions
-                WHERE reference_type = 'purchase'
-                  AND transaction_type = 'purchase_payment'
-                GROUP BY reference_id
-            ) pay ON pay.reference_id = p.id
+            SELECT *
+            FROM (
+                SELECT
+                    0 AS is_purchase,
+                    i.id,
+                    i.invoice_number AS reference_number,
+                    i.invoice_date AS document_date,
+                    i.customer_name AS party_name,
+                    i.total,
+                    i.vat_total,
+                    COALESCE(r.received_amount, 0) AS settled_amount
+                FROM invoices i
+                LEFT JOIN (
+                    SELECT reference_id, SUM(amount) AS received_amount
+                    FROM payment_transactions
+                    WHERE reference_type = 'invoice'
+                      AND transaction_type = 'invoice_receipt'
+                    GROUP BY reference_id
+                ) r ON r.reference_id = i.id
+                WHERE i.total > 0 AND i.vat_total > 0
+                UNION ALL
+                SELECT
+                    1 AS is_purchase,
+                    p.id,
+                    p.purchase_number,
+                    p.purchase_date,
+                    p.vendor_name,
+                    p.total,
+                    p.vat_total,
+                    COALESCE(pay.paid_amount, 0)
+                FROM purchase_invoices p
+                LEFT JOIN (
+                    SELECT reference_id, SUM(amount) AS paid_amount
+                    FROM payment_transactions
+                    WHERE reference_type = 'purchase'
+                      AND transaction_type = 'purchase_payment'
+                    GROUP BY reference_id
+                ) pay ON pay.reference_id = p.id
+                WHERE p.total > 0 AND p.vat_total > 0
+            )
+            ORDER BY COALESCE(NULLIF(document_date, ''), '0000-00-00') DESC, is_purchase, id
             """
         ).fetchall()
 
-        received_vat = Decimal("0")
+        received_vat = 0.0
         vat_entries = []
         quarterly_map = {}
 
@@ -3463,91 +3521,69 @@ def create_app(test_config=None):
             if quarter_key not in quarterly_map:
                 quarterly_map[quarter_key] = {
                     "quarter": quarter_key,
-                    "output_vat": Decimal("0"),
-                    "input_vat": Decimal("0"),
+                    "output_vat": 0.0,
+                    "input_vat": 0.0,
                 }
 
-        def quarter_from_date(date_value):
-            normalized = (date_value or "").strip()
-            if len(normalized) < 7:
-                return "Unknown"
-            try:
-                year, month = normalized.split("-")[:2]
-                month_number = int(month)
-                quarter_number = ((month_number - 1) // 3) + 1
-                return f"{year}-Q{quarter_number}"
-            except (ValueError, IndexError):
-                return "Unknown"
-
-        for row in invoice_vat_rows:
-            total_amount = Decimal(str(row["total"] or 0))
-            vat_amount = Decimal(str(row["vat_total"] or 0))
-            received_amount = Decimal(str(row["received_amount"] or 0))
-            if total_amount <= 0 or vat_amount <= 0:
-                continue
-            received_ratio = (
-                min(received_amount / total_amount, Decimal("1"))
-                if received_amount > 0
-                else Decimal("0")
-            )
-            recognized_vat = vat_amount * received_ratio
-            received_vat += recognized_vat
-
-            quarter_key = quarter_from_date(row["invoice_date"])
-            ensure_quarter_bucket(quarter_key)
-            quarterly_map[quarter_key]["output_vat"] += recognized_vat
+        quarter_cache = {}
 
-            vat_entries.append(
-                {
-                    "entry_type": "Sales VAT",
-                    "date": row["invoice_date"] or "-",
-                    "quarter": quarter_key,
-                    "reference_number": row["invoice_number"] or f"INV-{row['id']}",
-                    "party_name": row["customer_name"] or "-",
-                    "total_amount": float(total_amount),
-                    "vat_amount": float(vat_amount),
-                    "settled_amount": float(received_amount),
-                    "recognized_vat": float(recognized_vat),
-                }
-            )
+        def quarter_from_date(date_value):
+            quarter_key = quarter_cache.get(date_value)
+            if quarter_key is not None:
+                return quarter_key
 
-        paid_vat = Decimal("0")
-        for row in purchase_vat_rows:
-            total_amount = Decimal(str(row["total"] or 0))
-            vat_amount = Decimal(str(row["vat_total"] or 0))
-            paid_amount = Decimal(str(row["paid_amount"] or 0))
-            if total_amount <= 0 or vat_amount <= 0:
-                continue
-            paid_ratio = (
-                min(paid_amount / total_amount, Decimal("1"))
-                if paid_amount > 0
-                else Decimal("0")
+            quarter_key = "Unknown"
+            normalized = (date_value or "").strip()
+            if len(normalized) >= 7:
+                try:
+                    year, month = normalized.split("-")[:2]
+                    month_number = int(month)
+                    quarter_number = ((month_number - 1) // 3) + 1
+                    quarter_key = f"{year}-Q{quarter_number}"
+                except (ValueError, IndexError):
+                    pass
+            quarter_cache[date_value] = quarter_key
+            return quarter_key
+
+        paid_vat = 0.0
+        for row in vat_rows:
+            total_amount = row["total"]
+            vat_amount = row["vat_total"]
+            settled_amount = row["settled_amount"]
+            settled_ratio = (
+                min(settled_amount / total_amount, 1.0)
+                if settled_amount > 0
+                else 0.0
             )
-            recognized_vat = vat_amount * paid_ratio
-            paid_vat += recognized_vat
+            recognized_vat = vat_amount * settled_ratio
 
-            quarter_key = quarter_from_date(row["purchase_date"])
+            quarter_key = quarter_from_date(row["document_date"])
             ensure_quarter_bucket(quarter_key)
-            quarterly_map[quarter_key]["input_vat"] += recognized_vat
+            if row["is_purchase"]:
+                paid_vat += recognized_vat
+                quarterly_map[quarter_key]["input_vat"] += recognized_vat
+                entry_type = "Purchase VAT"
+                reference_number = row["reference_number"] or f"PUR-{row['id']}"
+            else:
+                received_vat += recognized_vat
+                quarterly_map[quarter_key]["output_vat"] += recognized_vat
+                entry_type = "Sales VAT"
+                reference_number = row["reference_number"] or f"INV-{row['id']}"
 
             vat_entries.append(
                 {
-                    "entry_type": "Purchase VAT",
-                    "date": row["purchase_date"] or "-",
+                    "entry_type": entry_type,
+                    "date": row["document_date"] or "-",
                     "quarter": quarter_key,
-                    "reference_number": row["purchase_number"] or f"PUR-{row['id']}",
-                    "party_name": row["vendor_name"] or "-",
-                    "total_amount": float(total_amount),
-                    "vat_amount": float(vat_amount),
-                    "settled_amount": float(paid_amount),
-                    "recognized_vat": float(recognized_vat),
+                    "reference_number": reference_number,
+                    "party_name": row["party_name"] or "-",
+                    "total_amount": total_amount,
+                    "vat_amount": vat_amount,
+                    "settled_amount": settled_amount,
+                    "recognized_vat": recognized_vat,
                 }
             )
 
-        vat_entries.sort(
-            key=lambda item: (item["date"] if item["date"] != "-" else "0000-00-00"), reverse=True
-        )
-
         vat_quarterly = []
         for quarter_key in sorted(quarterly_map.keys()):
             output_vat = quarterly_map[quarter_key]["output_vat"]
@@ -3556,78 +3592,46 @@ def create_app(test_config=None):
             vat_quarterly.append(
                 {
                     "quarter": quarter_key,
-                    "output_vat": float(output_vat),
-                    "input_vat": float(input_vat),
-                    "net_vat": float(net_vat),
+                    "output_vat": output_vat,
+                    "input_vat": input_vat,
+                    "net_vat": net_vat,
                 }
             )
 
-        monthly_invoices = db.execute(
-            """
-            SELECT strftime('%Y-%m', invoice_date) AS period, COALESCE(SUM(total), 0) AS total
-            FROM invoices
-            WHERE invoice_date IS NOT NULL AND invoice_date != ''
-            GROUP BY strftime('%Y-%m', invoice_date)
-            ORDER BY period ASC
-            """
-        ).fetchall()
-
-        monthly_purchases = db.execute(
-            """
-            SELECT strftime('%Y-%m', purchase_date) AS period, COALESCE(SUM(total), 0) AS total
-            FROM purchase_invoices
-            WHERE purchase_date IS NOT NULL AND purchase_date != ''
-            GROUP BY strftime('%Y-%m', purchase_date)
-            ORDER BY period ASC
-            """
-        ).fetchall()
-
-        monthly_expenses = db.execute(
+        monthly_rows = db.execute(
             """
-            SELECT strftime('%Y-%m', expense_date) AS period, COALESCE(SUM(amount), 0) AS total
-            FROM expenses
-            WHERE expense_date IS NOT NULL AND expense_date != ''
-            GROUP BY strftime('%Y-%m', expense_date)
+            SELECT
+                period,
+                TOTAL(sold) AS sold,
+                TOTAL(bought) AS bought,
+                TOTAL(expenses) AS expenses
+            FROM (
+                SELECT strftime('%Y-%m', invoice_date) AS period, COALESCE(SUM(total), 0) AS sold, 0 AS bought, 0 AS expenses
+                FROM invoices
+                WHERE invoice_date IS NOT NULL AND invoice_date != ''
+                GROUP BY strftime('%Y-%m', invoice_date)
+                UNION ALL
+                SELECT strftime('%Y-%m', purchase_date), 0, COALESCE(SUM(total), 0), 0
+                FROM purchase_invoices
+                WHERE purchase_date IS NOT NULL AND purchase_date != ''
+                GROUP BY strftime('%Y-%m', purchase_date)
+                UNION ALL
+                SELECT strftime('%Y-%m', expense_date), 0, 0, COALESCE(SUM(amount), 0)
+                FROM expenses
+                WHERE expense_date IS NOT NULL AND expense_date != ''
+                GROUP BY strftime('%Y-%m', expense_date)
+            )
+            WHERE period IS NOT NULL
+            GROUP BY period
             ORDER BY period ASC
             """
         ).fetchall()
 
-        monthly_map = {}
-        for row in monthly_invoices:
-            period = row["period"]
-            if not period:
-                continue
-            monthly_map.setdefault(
-                period, {"sold": Decimal("0"), "bought": Decimal("0"), "expenses": Decimal("0")}
-            )
-            monthly_map[period]["sold"] = Decimal(str(row["total"] or 0))
-
-        for row in monthly_purchases:
-            period = row["period"]
-            if not period:
-                continue
-            monthly_map.setdefault(
-                period, {"sold": Decimal("0"), "bought": Decimal("0"), "expenses": Decimal("0")}
-            )
-            monthly_map[period]["bought"] = Decimal(str(row["total"] or 0))
-
-        for row in monthly_expenses:
-            period = row["period"]
-            if not period:
-                continue
-            monthly_map.setdefault(
-                period, {"sold": Decimal("0"), "bought": Decimal("0"), "expenses": Decimal("0")}
-            )
-            monthly_map[period]["expenses"] = Decimal(str(row["total"] or 0))
-
-        monthly_labels = sorted(monthly_map.keys())
-        monthly_sold = [float(monthly_map[p]["sold"]) for p in monthly_labels]
-        monthly_bought = [float(monthly_map[p]["bought"]) for p in monthly_labels]
-        monthly_expenses_values = [float(monthly_map[p]["expenses"]) for p in monthly_labels]
-        monthly_turnover = [
-            float(monthly_map[p]["sold"] - monthly_map[p]["bought"] - monthly_map[p]["expenses"])
-            for p in monthly_labels
-        ]
+        monthly_labels = [row["period"] for row in monthly_rows]
+        monthly_sold = [row["sold"] for row in monthly_rows]
+        monthly_bought = [row["bought"] for row in monthly_rows]
+        monthly_expenses_values = [row["expenses"] for row in monthly_rows]
+        monthly_turnover = [row["sold"] - row["bought"] - row["expenses"] for row in monthly_rows]
 
         yearly_map = {}
         for period, sold, bought, expenses in zip(
@@ -3652,16 +3656,16 @@ def create_app(test_config=None):
             "report.html",
             page_title="Report",
             active_menu="Report",
-            sold_total=float(sold_total),
-            bought_total=float(bought_total),
-            expenses_total=float(expenses_total),
-            benefit=float(benefit),
-            loss=float(loss),
-            debt=float(debt),
-            should_receive=float(should_receive),
-            i_owe=float(i_owe),
-            received_vat=float(received_vat),
-            paid_vat=float(paid_vat),
+            sold_total=sold_total,
+            bought_total=bought_total,
+            expenses_total=expenses_total,
+            benefit=benefit,
+            loss=loss,
+            debt=debt,
+            should_receive=should_receive,
+            i_owe=i_owe,
+            received_vat=received_vat,
+            paid_vat=paid_vat,
             vat_quarterly=vat_quarterly,
             vat_entries=vat_entries,
             monthly_labels=json.dumps(monthly_labels),
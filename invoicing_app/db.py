@@ -1,13 +1,27 @@
+import functools
 import sqlite3
 
 import click
 from flask import current_app, g
 
+_tables_ready = {}
+
+
+def _normalized_name(value):
+    return (value or "").strip().lower()
+
 
 def get_db():
     if "db" not in g:
         g.db = sqlite3.connect(current_app.config["DATABASE"])
         g.db.row_factory = sqlite3.Row
+        g.db.execute("PRAGMA journal_mode = WAL")
+        g.db.execute("PRAGMA synchronous = NORMAL")
+        g.db.execute("PRAGMA temp_store = MEMORY")
+        g.db.execute("PRAGMA cache_size = -20000")
+        g.db.execute("PRAGMA mmap_size = 268435456")
+        g.db.execute("PRAGMA foreign_keys = ON")
+        g.db.create_function("normalized_name", 1, _normalized_name, deterministic=True)
     return g.db
 
 
@@ -17,12 +31,98 @@ def close_db(e=None):
         db.close()
 
 
+def optimize_db():
+    get_db().execute("PRAGMA optimize=0x10002")
+
+
 def init_db():
     db = get_db()
     with current_app.open_resource("schema.sql") as file:
         db.executescript(file.read().decode("utf8"))
 
 
+def _run_once_per_database(ensure):
+    @functools.wraps(ensure)
+    def wrapper():
+        ready = _tables_ready.setdefault(current_app.config["DATABASE"], set())
+        if ensure.__name__ in ready:
+            return
+        ensure()
+        ready.add(ensure.__name__)
+
+    return wrapper
+
+
+def reset_tables_ready():
+    _tables_ready.pop(current_app.config["DATABASE"], None)
+
+
+def _trigram_search_supported():
+    probe = sqlite3.connect(":memory:")
+    try:
+        probe.execute("CREATE VIRTUAL TABLE probe USING fts5(value, tokenize='trigram')")
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        probe.close()
+    return True
+
+
+SEARCH_INDEX_AVAILABLE = _trigram_search_supported()
+
+
+def _ensure_search_index(db, table, columns):
+    if not SEARCH_INDEX_AVAILABLE:
+        return
+
+    fts_table = f"{table}_fts"
+    names = (fts_table, f"{fts_table}_insert", f"{fts_table}_delete", f"{fts_table}_update")
+    existing = db.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name IN (?, ?, ?, ?)",
+        names,
+    ).fetchone()[0]
+    if existing == len(names):
+        return
+
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    db.execute(
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+          {column_list},
+          content='{table}',
+          content_rowid='id',
+          tokenize='trigram'
+        )
+        """
+    )
+    db.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_insert AFTER INSERT ON {table} BEGIN
+          INSERT INTO {fts_table} (rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+        """
+    )
+    db.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_delete AFTER DELETE ON {table} BEGIN
+          INSERT INTO {fts_table} ({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+        END
+        """
+    )
+    db.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_update AFTER UPDATE ON {table} BEGIN
+          INSERT INTO {fts_table} ({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+          INSERT INTO {fts_table} (rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+        """
+    )
+    db.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+
+
+@_run_once_per_database
 def ensure_items_table():
     db = get_db()
     exists = db.execute(
@@ -44,6 +144,7 @@ def ensure_items_table():
             )
             """
         )
+        _ensure_search_index(db, "items", ("item_number", "name", "unit", "description"))
         db.commit()
         return
 
@@ -77,26 +178,15 @@ def ensure_items_table():
             DROP TABLE items_old;
             """
         )
+        _ensure_search_index(db, "items", ("item_number", "name", "unit", "description"))
         db.commit()
         return
 
-    db.execute(
-        """
-        CREATE TABLE IF NOT EXISTS items (
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          item_number TEXT NOT NULL UNIQUE,
-          name TEXT NOT NULL,
-                    price REAL,
-                    vat_amount REAL,
-                    unit TEXT,
-          description TEXT,
-          created_at TEXT DEFAULT CURRENT_TIMESTAMP
-        )
-        """
-    )
+    _ensure_search_index(db, "items", ("item_number", "name", "unit", "description"))
     db.commit()
 
 
+@_run_once_per_database
 def ensure_customers_table():
         db = get_db()
         db.execute(
@@ -125,9 +215,26 @@ def ensure_customers_table():
             db.execute(
                 "UPDATE customers SET customer_type = 'Company' WHERE customer_type IS NULL OR customer_type = ''"
             )
+        _ensure_search_index(
+                db,
+                "customers",
+                (
+                        "customer_number",
+                        "customer_type",
+                        "customer_name",
+                        "customer_tax_number",
+                        "registration_name",
+                        "phone_number",
+                        "address",
+                        "website",
+                        "country",
+                        "address_2",
+                ),
+        )
         db.commit()
 
 
+@_run_once_per_database
 def ensure_vendors_table():
     db = get_db()
     db.execute(
@@ -156,12 +263,28 @@ def ensure_vendors_table():
         db.execute(
             "UPDATE vendors SET vendor_type = 'Company' WHERE vendor_type IS NULL OR vendor_type = ''"
         )
+    _ensure_search_index(
+        db,
+        "vendors",
+        (
+            "vendor_number",
+            "vendor_type",
+            "vendor_name",
+            "vendor_tax_number",
+            "registration_name",
+            "phone_number",
+            "address",
+            "website",
+            "country",
+            "address_2",
+        ),
+    )
     db.commit()
 
 
+@_run_once_per_database
 def ensure_invoices_tables():
     db = get_db()
-    db.execute("PRAGMA foreign_keys = ON")
     db.execute(
         """
         CREATE TABLE IF NOT EXISTS invoices (
@@ -185,6 +308,9 @@ def ensure_invoices_tables():
         )
         """
     )
+    db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_invoices_date_total ON invoices(invoice_date, total)"
+    )
     db.execute(
         """
         CREATE TABLE IF NOT EXISTS invoice_items (
@@ -201,12 +327,19 @@ def ensure_invoices_tables():
         )
         """
     )
+    db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_invoice_items_invoice ON invoice_items(invoice_id)"
+    )
+    db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_invoice_items_item ON invoice_items(item_id)"
+    )
+    _ensure_search_index(db, "invoices", ("invoice_number", "invoice_date", "customer_name"))
     db.commit()
 
 
+@_run_once_per_database
 def ensure_purchase_invoices_tables():
         db = get_db()
-        db.execute("PRAGMA foreign_keys = ON")
         db.execute(
                 """
                 CREATE TABLE IF NOT EXISTS purchase_invoices (
@@ -230,6 +363,9 @@ def ensure_purchase_invoices_tables():
                 )
                 """
         )
+        db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_purchase_date_total ON purchase_invoices(purchase_date, total)"
+        )
         db.execute(
                 """
                 CREATE TABLE IF NOT EXISTS purchase_invoice_items (
@@ -246,9 +382,17 @@ def ensure_purchase_invoices_tables():
                 )
                 """
         )
+        db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_purchase_items_purchase ON purchase_invoice_items(purchase_invoice_id)"
+        )
+        db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_purchase_items_item ON purchase_invoice_items(item_id)"
+        )
+        _ensure_search_index(db, "purchase_invoices", ("purchase_number", "purchase_date", "vendor_name"))
         db.commit()
 
 
+@_run_once_per_database
 def ensure_expenses_table():
         db = get_db()
         db.execute(
@@ -274,10 +418,111 @@ def ensure_expenses_table():
             db.execute("ALTER TABLE expenses ADD COLUMN payment_method_id INTEGER")
         if "currency_code" not in column_names:
             db.execute("ALTER TABLE expenses ADD COLUMN currency_code TEXT")
+        db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_expenses_date_amount ON expenses(expense_date, amount)"
+        )
+        _ensure_search_index(db, "expenses", ("expense_number", "expense_date", "title", "category", "notes"))
 
         db.commit()
 
 
+@_run_once_per_database
+def ensure_monthly_totals_table():
+    ensure_invoices_tables()
+    ensure_purchase_invoices_tables()
+    ensure_expenses_table()
+
+    db = get_db()
+    existing = db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'monthly_totals'"
+    ).fetchone()
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS monthly_totals (
+          period TEXT PRIMARY KEY,
+          sales REAL NOT NULL DEFAULT 0,
+          purchases REAL NOT NULL DEFAULT 0,
+          expenses REAL NOT NULL DEFAULT 0
+        )
+        """
+    )
+
+    for table, date_column, amount_column, total_column in (
+        ("invoices", "invoice_date", "total", "sales"),
+        ("purchase_invoices", "purchase_date", "total", "purchases"),
+        ("expenses", "expense_date", "amount", "expenses"),
+    ):
+        db.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_monthly_insert
+            AFTER INSERT ON {table}
+            WHEN strftime('%Y-%m', NEW.{date_column}) IS NOT NULL
+            BEGIN
+              INSERT INTO monthly_totals (period, {total_column})
+              VALUES (strftime('%Y-%m', NEW.{date_column}), NEW.{amount_column})
+              ON CONFLICT(period) DO UPDATE SET {total_column} = ROUND({total_column} + excluded.{total_column}, 6);
+            END
+            """
+        )
+        db.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_monthly_delete
+            AFTER DELETE ON {table}
+            WHEN strftime('%Y-%m', OLD.{date_column}) IS NOT NULL
+            BEGIN
+              UPDATE monthly_totals
+              SET {total_column} = ROUND({total_column} - OLD.{amount_column}, 6)
+              WHERE period = strftime('%Y-%m', OLD.{date_column});
+            END
+            """
+        )
+        db.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_monthly_update
+            AFTER UPDATE OF {date_column}, {amount_column} ON {table}
+            BEGIN
+              UPDATE monthly_totals
+              SET {total_column} = ROUND({total_column} - OLD.{amount_column}, 6)
+              WHERE period = strftime('%Y-%m', OLD.{date_column});
+              INSERT INTO monthly_totals (period, {total_column})
+              SELECT strftime('%Y-%m', NEW.{date_column}), NEW.{amount_column}
+              WHERE strftime('%Y-%m', NEW.{date_column}) IS NOT NULL
+              ON CONFLICT(period) DO UPDATE SET {total_column} = ROUND({total_column} + excluded.{total_column}, 6);
+            END
+            """
+        )
+
+    db.commit()
+
+    if existing is None:
+        rebuild_monthly_totals()
+
+
+def rebuild_monthly_totals():
+    db = get_db()
+    db.execute("DELETE FROM monthly_totals")
+    db.execute(
+        """
+        INSERT INTO monthly_totals (period, sales, purchases, expenses)
+        SELECT period, ROUND(SUM(sales), 6), ROUND(SUM(purchases), 6), ROUND(SUM(expenses), 6)
+        FROM (
+          SELECT strftime('%Y-%m', invoice_date) AS period, total AS sales, 0 AS purchases, 0 AS expenses
+          FROM invoices
+          UNION ALL
+          SELECT strftime('%Y-%m', purchase_date), 0, total, 0
+          FROM purchase_invoices
+          UNION ALL
+          SELECT strftime('%Y-%m', expense_date), 0, 0, amount
+          FROM expenses
+        )
+        WHERE period IS NOT NULL
+        GROUP BY period
+        """
+    )
+    db.commit()
+
+
+@_run_once_per_database
 def ensure_payment_tables():
         db = get_db()
         db.execute(
@@ -320,6 +565,34 @@ def ensure_payment_tables():
             )
             """
         )
+        db.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_paytx_ref
+            ON payment_transactions(reference_type, transaction_type, reference_id, amount)
+            """
+        )
+        db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS lookup_version (
+              id INTEGER PRIMARY KEY CHECK (id = 1),
+              version TEXT NOT NULL
+            )
+            """
+        )
+        db.execute(
+            "INSERT OR IGNORE INTO lookup_version (id, version) VALUES (1, lower(hex(randomblob(8))))"
+        )
+        for table in ("payment_methods", "payment_currencies"):
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                db.execute(
+                    f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+                    AFTER {event} ON {table}
+                    BEGIN
+                      UPDATE lookup_version SET version = lower(hex(randomblob(8))) WHERE id = 1;
+                    END
+                    """
+                )
 
         defaults = [
             ("USD", "US Dollar", "$", 0),
@@ -329,18 +602,18 @@ def ensure_payment_tables():
             ("BTC", "Bitcoin", "₿", 1),
             ("ETH", "Ethereum", "Ξ", 1),
         ]
-        for code, name, symbol, is_crypto in defaults:
-            db.execute(
-                """
-                INSERT OR IGNORE INTO payment_currencies (code, name, symbol, is_crypto)
-                VALUES (?, ?, ?, ?)
-                """,
-                (code, name, symbol, is_crypto),
-            )
+        db.executemany(
+            """
+            INSERT OR IGNORE INTO payment_currencies (code, name, symbol, is_crypto)
+            VALUES (?, ?, ?, ?)
+            """,
+            defaults,
+        )
 
         db.commit()
 
 
+@_run_once_per_database
 def ensure_users_table():
         db = get_db()
         db.execute(
@@ -366,6 +639,18 @@ def ensure_users_table():
         db.commit()
 
 
+def ensure_all_tables():
+    ensure_items_table()
+    ensure_customers_table()
+    ensure_vendors_table()
+    ensure_invoices_tables()
+    ensure_purchase_invoices_tables()
+    ensure_expenses_table()
+    ensure_monthly_totals_table()
+    ensure_payment_tables()
+    ensure_users_table()
+
+
 @click.command("init-db")
 def init_db_command():
     init_db()